@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+
+from online_stats import outcome_labels
+from schema import READ_DTYPES, apply_schema
+
+STRATA = ("Course", "Grade")
+Z_95 = 1.959963984540054
+
+
+class Estimate:
+    """A point estimate with a 95% confidence interval."""
+
+    def __init__(self, value, low, high):
+        self.value = float(value)
+        self.low = float(low)
+        self.high = float(high)
+
+    @property
+    def margin(self):
+        return (self.high - self.low) / 2
+
+    def __repr__(self):
+        return f"Estimate({self.value:.4g} [{self.low:.4g}, {self.high:.4g}])"
+
+
+class StratifiedSample:
+    """Uniform random sample of up to ``per_stratum`` rows from every Course x outcome stratum.
+
+    Each sampled row stands for ``N_h / n_h`` students of its stratum, so
+    totals, proportions, means and quantiles are estimated with the
+    stratified estimators and come with confidence intervals. Strata with
+    fewer students than ``per_stratum`` are kept whole and contribute no
+    sampling error.
+    """
+
+    def __init__(self, rows, population, per_stratum):
+        self.rows = rows
+        self.population = population  # Students per stratum (N_h)
+        self.per_stratum = per_stratum
+        grouped = rows.groupby(list(STRATA), observed=True)
+        self._stratum = grouped.ngroup().to_numpy()
+        sizes = grouped.size()
+        self._n_h = sizes.to_numpy(dtype=float)  # Sampled per stratum, in ngroup order
+        self._N_h = population.reindex(sizes.index).to_numpy(dtype=float)
+        self.weights = (self._N_h / self._n_h)[self._stratum]
+
+    @property
+    def n(self):
+        return int(self.population.sum())
+
+    @classmethod
+    def from_csv(cls, path, per_stratum=200, chunksize=200_000, seed=0):
+        """One streaming pass: per stratum, keep the rows with the smallest random keys seen so far."""
+        rng = np.random.default_rng(seed)
+        kept, population = None, None
+        for chunk in pd.read_csv(path, dtype=READ_DTYPES, chunksize=chunksize):
+            chunk = apply_schema(chunk)
+            chunk["Grade"] = outcome_labels(chunk)
+            chunk["_key"] = rng.random(len(chunk))
+            counts = chunk.groupby(list(STRATA), observed=True).size()
+            population = counts if population is None else population.add(counts, fill_value=0)
+            kept = chunk if kept is None else pd.concat([kept, chunk], ignore_index=True)
+            kept = kept.sort_values("_key").groupby(list(STRATA), observed=True).head(per_stratum)
+        kept = kept.drop(columns="_key").reset_index(drop=True)
+        return cls(kept, population.astype(int), per_stratum)
+
+    def _total(self, values):
+        """Stratified estimate of the cohort total of ``values`` (one value per sampled row)."""
+        values = np.asarray(values, dtype=float)
+        n_h, N_h = self._n_h, self._N_h
+        mean_h = np.bincount(self._stratum, weights=values, minlength=len(n_h)) / n_h
+        sq_h = np.bincount(self._stratum, weights=(values - mean_h[self._stratum]) ** 2, minlength=len(n_h))
+        var_h = np.divide(sq_h, n_h - 1, out=np.zeros_like(sq_h), where=n_h > 1)
+        fpc = 1 - n_h / N_h  # Finite population correction: strata kept whole have no sampling error
+        value = np.sum(N_h * mean_h)
+        se = np.sqrt(np.sum(N_h ** 2 * fpc * var_h / n_h))
+        return Estimate(value, value - Z_95 * se, value + Z_95 * se)
+
+    def _ratio(self, values, mask):
+        """Mean of ``values`` over the students where ``mask`` holds (linearised ratio estimator)."""
+        values = np.asarray(values, dtype=float)
+        mask = np.asarray(mask, dtype=float)
+        size = self._total(mask).value
+        ratio = self._total(values * mask).value / size
+        se = self._total((values - ratio) * mask / size).margin / Z_95
+        return Estimate(ratio, ratio - Z_95 * se, ratio + Z_95 * se)
+
+    def proportion(self, mask):
+        """Share of the cohort for which ``mask`` (over the sampled rows) holds."""
+        est = self._ratio(mask, np.ones(len(self.rows)))
+        return Estimate(est.value, max(est.low, 0.0), min(est.high, 1.0))
+
+    def count(self, mask):
+        est = self._total(mask)
+        return Estimate(est.value, max(est.low, 0.0), est.high)
+
+    def mean(self, column, mask=None):
+        """Mean of ``column``, optionally only over the rows where ``mask`` holds."""
+        mask = np.ones(len(self.rows)) if mask is None else mask
+        return self._ratio(self.rows[column].to_numpy(dtype=float), mask)
+
+    def quantile(self, column, q, mask=None):
+        """Weighted sample quantile with Woodruff's interval: the CI of the CDF at the estimate, mapped back.
+
+        NaN (value and bounds) when ``mask`` selects no sampled rows, e.g. an outcome absent from the cohort.
+        """
+        values = self.rows[column].to_numpy(dtype=float)
+        keep = np.ones(len(values), dtype=bool) if mask is None else np.asarray(mask, dtype=bool)
+        if not keep.any():
+            return Estimate(np.nan, np.nan, np.nan)
+        order = np.argsort(values[keep], kind="mergesort")
+        sorted_values = values[keep][order]
+        cdf = np.cumsum(self.weights[keep][order])
+        cdf /= cdf[-1]
+
+        def at(p):
+            return float(sorted_values[min(np.searchsorted(cdf, np.clip(p, 0, 1)), len(sorted_values) - 1)])
+
+        point = at(q)
+        share = self._ratio(values <= point, keep).margin
+        return Estimate(point, at(q - share), at(q + share))
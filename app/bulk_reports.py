@@ -0,0 +1,166 @@
+import os
+import tempfile
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from datetime import datetime
+
+# Kept free of pandas/sklearn imports so spawned report workers start quickly
+
+REPORT_TEMPLATE = """
+=============================================================
+       🎓 EDUPREDICT | ACADEMIC INTELLIGENCE REPORT
+=============================================================
+
+[REPORT METADATA]
+-------------------------------------------------------------
+Generated By:       {role}
+Date:               {date}
+Time:               {time}
+System Version:     v{version}
+{student_ref}
+[STUDENT PROFILE]
+-------------------------------------------------------------
+Age at Enrollment:  {age}
+Admission Grade:    {admission_grade}
+Gender:             {gender}
+Scholarship:        {scholarship}
+Tuition Status:     {tuition}
+Sem 1 Grade:        {sem1_grade}
+Sem 2 Grade:        {sem2_grade}
+
+[ECONOMIC CONTEXT]
+-------------------------------------------------------------
+Unemployment Rate:  {unemployment}%
+Inflation Rate:     {inflation}%
+GDP Index:          {gdp}
+
+[ANALYSIS RESULTS]
+-------------------------------------------------------------
+Predicted Outcome:  {result}
+Confidence Score:   {confidence}%
+Anomaly Detected:   {anomaly}
+Next Sem Forecast:  {sem2_pred} (Estimated)
+
+[INTERVENTION NOTE]
+-------------------------------------------------------------
+This report is generated by an AI model. The predictions
+are advisory. Please consult with academic counselors for
+authorized support plans.
+
+=============================================================
+© 2024 EduPredict Systems. All Rights Reserved.
+=============================================================
+"""
+
+
+def render_report_txt(role, profile, result, confidence, is_anomaly, sem2_pred, version, student_ref=None,
+                      generated_at=None):
+    """Fill the report template. ``profile`` holds the form-style inputs (gender "male"/"female", "yes"/"no" flags)."""
+    generated_at = generated_at or datetime.now()
+    return REPORT_TEMPLATE.format(
+        role=role.upper(),
+        date=generated_at.strftime('%Y-%m-%d'),
+        time=generated_at.strftime('%H:%M:%S'),
+        version=version,
+        student_ref=f"Student Ref:        {student_ref}\n" if student_ref is not None else "",
+        age=profile["age"],
+        admission_grade=profile["admission_grade"],
+        gender=profile["gender"].capitalize(),
+        scholarship=profile["scholarship"].capitalize(),
+        tuition='Paid' if profile["tuition_paid"] == 'yes' else 'Unpaid',
+        sem1_grade=profile["sem1_grade"],
+        sem2_grade=profile["sem2_grade"],
+        unemployment=profile["unemployment"],
+        inflation=profile["inflation"],
+        gdp=profile["gdp"],
+        result=result.upper(),
+        confidence=confidence,
+        anomaly='YES' if is_anomaly else 'NO',
+        sem2_pred=round(sem2_pred, 2),
+    )
+
+
+def _pdf_escape(line):
+    line = line.encode("latin-1", "ignore").decode("latin-1")  # Core PDF fonts have no emoji
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def text_to_pdf(text, font_size=9, lines_per_page=80):
+    """Minimal multi-page PDF of monospaced text using the built-in Courier font."""
+    lines = text.strip("\n").splitlines() or [""]
+    pages = [lines[i:i + lines_per_page] for i in range(0, len(lines), lines_per_page)]
+    leading = font_size + 2
+
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>"]
+    page_ids = []
+    for page in pages:
+        body = "\n".join(f"({_pdf_escape(line)}) '" for line in page)
+        stream = f"BT /F1 {font_size} Tf {leading} TL 40 800 Td\n{body}\nET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % len(objects))
+        page_ids.append(len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (
+        b" ".join(b"%d 0 R" % i for i in page_ids), len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (number, obj)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def render_chunk(records, role, version, formats, generated_at):
+    """Worker entry point: render a chunk of student records into ``(archive name, bytes)`` pairs."""
+    files = []
+    for rec in records:
+        txt = render_report_txt(role, rec, rec["result"], rec["confidence"], rec["is_anomaly"], rec["sem2_pred"],
+                                version, student_ref=rec["student_ref"], generated_at=generated_at)
+        stem = f"student_{rec['student_ref']}_{rec['result'].lower()}"
+        if "txt" in formats:
+            files.append((f"txt/{stem}.txt", txt.encode("utf-8")))
+        if "pdf" in formats:
+            files.append((f"pdf/{stem}.pdf", text_to_pdf(txt)))
+    return files
+
+
+def generate_bulk_reports(pool, records, role, version, formats=("txt",), chunk_size=250, progress=None,
+                          max_in_flight=None):
+    """Render one report per record across ``pool`` and stream them into a ZIP file as chunks finish.
+
+    At most ``max_in_flight`` chunks are outstanding, so memory stays flat no
+    matter how many students are selected. Returns the path of the ZIP file;
+    the caller is responsible for removing it.
+    """
+    generated_at = datetime.now()
+    chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+    max_in_flight = max_in_flight or 2 * (getattr(pool, "_max_workers", None) or os.cpu_count() or 1)
+
+    fd, zip_path = tempfile.mkstemp(prefix="edupredict_reports_", suffix=".zip")
+    os.close(fd)
+    done_count = 0
+    with zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        pending = set()
+
+        def _drain(finished):
+            nonlocal done_count
+            for future in finished:
+                for name, data in future.result():
+                    archive.writestr(name, data)
+                done_count += 1
+                if progress:
+                    progress(done_count, len(chunks))
+
+        for chunk in chunks:
+            if len(pending) >= max_in_flight:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                _drain(finished)
+            pending.add(pool.submit(render_chunk, chunk, role, version, tuple(formats), generated_at))
+        _drain(wait(pending).done)
+    return zip_path
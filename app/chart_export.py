@@ -0,0 +1,104 @@
+import asyncio
+import hashlib
+import io
+import threading
+import zipfile
+from collections import OrderedDict
+
+EXPORT_FORMATS = ("png", "svg", "pdf")
+EXPORT_MIME_TYPES = {"png": "image/png", "svg": "image/svg+xml", "pdf": "application/pdf"}
+
+
+class ChartExporter:
+    """Server-side Plotly image export through a long-lived Kaleido renderer pool.
+
+    One headless Chrome with ``n_renderers`` tabs is opened on a private event
+    loop thread as soon as the exporter is created, and reused for every
+    request, so the per-call browser start-up cost is paid once per server.
+    Rendered images are cached by a hash of the figure JSON and export options.
+    """
+
+    def __init__(self, n_renderers=2, cache_size=256, timeout=60):
+        self.timeout = timeout
+        self.cache_size = cache_size
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="chart-export-loop", daemon=True)
+        self._thread.start()
+        # Warm the renderers in the background; callers wait on this future only when they export
+        self._renderer = asyncio.run_coroutine_threadsafe(self._open(n_renderers), self._loop)
+
+    async def _open(self, n_renderers):
+        import kaleido
+
+        renderer = kaleido.Kaleido(n=n_renderers, timeout=self.timeout)
+        await renderer.__aenter__()  # Held open for the lifetime of the server
+        return renderer
+
+    @property
+    def ready(self):
+        return self._renderer.done() and self._renderer.exception() is None
+
+    @property
+    def error(self):
+        if self._renderer.done() and self._renderer.exception() is not None:
+            exc = self._renderer.exception()
+            return f"{type(exc).__name__}: {exc}"
+        return None
+
+    @staticmethod
+    def _cache_key(fig, fmt, width, height, scale):
+        digest = hashlib.sha256(fig.to_json().encode("utf-8"))
+        digest.update(f"|{fmt}|{width}|{height}|{scale}".encode("utf-8"))
+        return digest.hexdigest()
+
+    def _submit(self, fig, fmt, width, height, scale):
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"Unsupported export format: {fmt}")
+        renderer = self._renderer.result(self.timeout)
+        opts = {"format": fmt, "scale": scale}
+        if width:
+            opts["width"] = width
+        if height:
+            opts["height"] = height
+        return asyncio.run_coroutine_threadsafe(renderer.calc_fig(fig, opts=opts), self._loop)
+
+    def _remember(self, key, data):
+        with self._cache_lock:
+            self._cache[key] = data
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _cached(self, key):
+        with self._cache_lock:
+            data = self._cache.get(key)
+            if data is not None:
+                self._cache.move_to_end(key)
+            return data
+
+    def export(self, fig, fmt="png", width=None, height=None, scale=1):
+        """Image bytes for one figure."""
+        key = self._cache_key(fig, fmt, width, height, scale)
+        data = self._cached(key)
+        if data is None:
+            data = self._submit(fig, fmt, width, height, scale).result(self.timeout)
+            self._remember(key, data)
+        return data
+
+    def export_batch(self, figures, fmt="png", width=None, height=None, scale=1):
+        """ZIP of ``{name: figure}``, rendered concurrently across the pool's tabs."""
+        keys = {name: self._cache_key(fig, fmt, width, height, scale) for name, fig in figures.items()}
+        images = {name: self._cached(key) for name, key in keys.items()}
+        pending = {name: self._submit(figures[name], fmt, width, height, scale)
+                   for name, data in images.items() if data is None}
+        for name, future in pending.items():
+            images[name] = future.result(self.timeout)
+            self._remember(keys[name], images[name])
+
+        buffer = io.BytesIO()
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for name, data in images.items():
+                archive.writestr(f"{name}.{fmt}", data)
+        return buffer.getvalue()
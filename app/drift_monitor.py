@@ -0,0 +1,139 @@
+import threading
+
+import numpy as np
+import pandas as pd
+
+# --- DRIFT THRESHOLDS (industry-standard PSI bands) ---
+PSI_MODERATE = 0.1
+PSI_MAJOR = 0.25
+
+_EPS = 1e-6
+
+
+def _drift_status(psi):
+    if psi >= PSI_MAJOR:
+        return "MAJOR DRIFT"
+    if psi >= PSI_MODERATE:
+        return "MODERATE"
+    return "STABLE"
+
+
+def _psi(expected, actual):
+    """Population Stability Index between two count vectors."""
+    e = expected / max(expected.sum(), 1) + _EPS
+    a = actual / max(actual.sum(), 1) + _EPS
+    return float(np.sum((a - e) * np.log(a / e)))
+
+
+def _ks(expected, actual):
+    """KS statistic on the binned CDFs (exact at the bin edges)."""
+    e = np.cumsum(expected) / max(expected.sum(), 1)
+    a = np.cumsum(actual) / max(actual.sum(), 1)
+    return float(np.max(np.abs(a - e)))
+
+
+class HistogramSketch:
+    """Fixed-bin streaming histogram.
+
+    Bin edges are frozen when the sketch is created, so memory is
+    ``len(edges) + 1`` counters and each update is a binary search per value,
+    independent of how many values have been seen.
+    """
+
+    def __init__(self, edges):
+        self.edges = np.asarray(edges, dtype=float)
+        self.counts = np.zeros(len(self.edges) + 1, dtype=np.int64)
+
+    @classmethod
+    def from_reference(cls, values, n_bins=10):
+        values = np.asarray(values, dtype=float)
+        values = values[~np.isnan(values)]
+        qs = np.linspace(0, 1, n_bins + 1)[1:-1]
+        edges = np.unique(np.quantile(values, qs)) if len(values) else np.array([])
+        sketch = cls(edges)
+        sketch.update(values)
+        return sketch
+
+    def empty_like(self):
+        return HistogramSketch(self.edges)
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            np.add.at(self.counts, np.searchsorted(self.edges, values, side="right"), 1)
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+
+class DriftMonitor:
+    """Compares live model inputs and predicted class mix with the training data.
+
+    One histogram per feature and one class-count vector per model are kept,
+    so memory and per-update cost stay constant regardless of traffic.
+    """
+
+    def __init__(self, reference_df, feature_columns, class_labels, reference_labels=None, n_bins=10):
+        self.feature_columns = list(feature_columns)
+        self.class_labels = list(class_labels)
+        self._lock = threading.Lock()
+
+        self._reference = {
+            col: HistogramSketch.from_reference(reference_df[col].astype(float), n_bins)
+            for col in self.feature_columns
+        }
+        self._live = {col: sketch.empty_like() for col, sketch in self._reference.items()}
+
+        if reference_labels is not None:
+            counts = pd.Series(reference_labels).value_counts()
+            self._reference_mix = np.array([counts.get(c, 0) for c in self.class_labels], dtype=np.int64)
+        else:
+            self._reference_mix = np.ones(len(self.class_labels), dtype=np.int64)
+        self._live_mix = {}
+
+    def observe(self, rows, model_name=None, predictions=None):
+        """Fold a batch of input rows (and optionally their predictions) into the live sketches."""
+        with self._lock:
+            for col in self.feature_columns:
+                if col in rows.columns:
+                    self._live[col].update(pd.to_numeric(rows[col], errors="coerce").to_numpy())
+            if model_name is not None and predictions is not None:
+                mix = self._live_mix.setdefault(model_name, np.zeros(len(self.class_labels), dtype=np.int64))
+                for p in np.atleast_1d(predictions):
+                    if 0 <= int(p) < len(mix):
+                        mix[int(p)] += 1
+
+    def feature_report(self):
+        with self._lock:
+            records = []
+            for col in self.feature_columns:
+                ref, live = self._reference[col], self._live[col]
+                if live.total == 0:
+                    continue
+                psi = _psi(ref.counts, live.counts)
+                records.append({
+                    "Feature": col,
+                    "Observed": live.total,
+                    "PSI": round(psi, 4),
+                    "KS": round(_ks(ref.counts, live.counts), 4),
+                    "Status": _drift_status(psi),
+                })
+        report = pd.DataFrame(records, columns=["Feature", "Observed", "PSI", "KS", "Status"])
+        return report.sort_values("PSI", ascending=False).reset_index(drop=True)
+
+    def prediction_report(self):
+        with self._lock:
+            records = []
+            ref_share = self._reference_mix / max(self._reference_mix.sum(), 1)
+            for model_name, mix in self._live_mix.items():
+                live_share = mix / max(mix.sum(), 1)
+                psi = _psi(self._reference_mix, mix)
+                record = {"Model": model_name, "Predictions": int(mix.sum())}
+                for label, r, l in zip(self.class_labels, ref_share, live_share):
+                    record[f"{label} %"] = f"{l * 100:.1f} (ref {r * 100:.1f})"
+                record["PSI"] = round(psi, 4)
+                record["Status"] = _drift_status(psi)
+                records.append(record)
+        return pd.DataFrame(records)
@@ -1,15 +1,37 @@
 import streamlit as st
 import pandas as pd
 import numpy as np
-import joblib
 import os
-import plotly.express as px
-import plotly.graph_objects as go
-from streamlit_lottie import st_lottie
-import requests
 from datetime import datetime
 import time
 import warnings
+import sys
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+# Sibling modules must resolve however the script is launched (streamlit run, AppTest, ...);
+# the script reruns on every interaction, so only add the directory once
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+if APP_DIR not in sys.path:
+    sys.path.insert(0, APP_DIR)
+
+from preload import (ANOMALY_MODEL_FILE, CANDIDATE_MODEL_FILES, MODELS_DIR, TREND_MODEL_FILE, load_cohort_stats,
+                     load_dataset, load_model_or_none, load_model_router, load_stratified_sample, start_prewarm,
+                     startup_report, timed_import)
+
+# The sibling modules below are imported before login; going through timed_import
+# first puts their import cost in the STARTUP PROFILE (a no-op after the first run)
+for _module in ("bulk_reports", "chart_export", "drift_monitor", "explain", "prediction_log", "rescoring"):
+    timed_import(_module)
+
+from bulk_reports import generate_bulk_reports, render_report_txt
+from chart_export import EXPORT_FORMATS, EXPORT_MIME_TYPES, ChartExporter
+from drift_monitor import DriftMonitor
+from explain import explain
+from online_stats import OUTCOMES
+from prediction_log import PredictionLog
+from rescoring import AlertStore, RescoringScheduler, rescore_cohort
+from schema import to_model_input
 
 # Suppress version compatibility warnings
 warnings.filterwarnings("ignore", category=UserWarning, module="sklearn.base")
@@ -302,6 +324,32 @@ st.markdown(f"""
 </div>
 """, unsafe_allow_html=True)
 
+# --- RESOURCE PATHS ---
+# EDUPREDICT_DATA_DIR points the app at another data directory (the load test runs on a scratch copy)
+data_dir = os.environ.get("EDUPREDICT_DATA_DIR")
+# Check if the data file exists at the expected path
+data_path = os.path.join(data_dir or os.path.join(os.getcwd(), "data"), "academic_cleaned.csv")
+if not data_dir and not os.path.exists(data_path):
+    # Try a fallback if run from a different context
+    data_path = "data/academic_cleaned.csv"
+
+models_dir = MODELS_DIR
+anomaly_path = os.path.join(models_dir, ANOMALY_MODEL_FILE)
+trend_path = os.path.join(models_dir, TREND_MODEL_FILE)
+candidate_files = [(name, os.path.join(models_dir, filename)) for name, filename in CANDIDATE_MODEL_FILES]
+
+# Warm plotting libs, dataset and models while the login page is on screen
+start_prewarm(data_path, [anomaly_path, trend_path], candidate_files)
+
+
+# Chart image renderers (headless Chrome via kaleido) start with the server and are reused by every session
+@st.cache_resource
+def get_chart_exporter():
+    return ChartExporter(n_renderers=int(os.environ.get("EDUPREDICT_RENDERERS", 2)))
+
+
+chart_exporter = get_chart_exporter()
+
 auth_users = {
     "student": "studentpass",
     "teacher": "teacherpass",
@@ -366,33 +414,17 @@ if st.session_state.logged_in:
         st.session_state.logged_in = False
         st.rerun()
 
-    # Load Models & Data
+    # Heavy plotting imports are only needed once a dashboard is shown
+    px = timed_import("plotly.express")
+    go = timed_import("plotly.graph_objects")
+
+    # Load Models & Data (process-wide cache, usually already warm)
     try:
-        # Check if the data file exists at the expected path
-        data_path = os.path.join(os.getcwd(), "data", "academic_cleaned.csv")
-        if not os.path.exists(data_path):
-            # Try a fallback if run from a different context
-            data_path = "data/academic_cleaned.csv"
-        df = pd.read_csv(data_path)
-
-
-        # Load models
-        def load_model_or_none(path):
-            if os.path.exists(path):
-                return joblib.load(path)
-            return None
-
-
-        models_dir = "models"
-        anomaly_model = load_model_or_none(os.path.join(models_dir, "anomaly_model.pkl"))
-        trend_model = load_model_or_none(os.path.join(models_dir, "trend_model.pkl"))
-
-        candidate_files = [
-            ("Tuned Logistic Regression", os.path.join(models_dir, "tuned_logistic_regression_model.pkl")),
-            ("Tuned Random Forest", os.path.join(models_dir, "tuned_random_forest_model.pkl")),
-            ("Tuned XGBoost", os.path.join(models_dir, "tuned_xgboost_model.pkl")),
-            ("Baseline Random Forest", os.path.join(models_dir, "rf_model.pkl")),
-        ]
+        df = load_dataset(data_path)
+        cohort_stats = load_cohort_stats(data_path)
+
+        anomaly_model = load_model_or_none(anomaly_path)
+        trend_model = load_model_or_none(trend_path)
 
         available_models = {}
         for display_name, path in candidate_files:
@@ -408,17 +440,69 @@ if st.session_state.logged_in:
         st.error(f"SYSTEM ERROR: Model/Data Loading Failed: {str(e)}")
         models_loaded = False
 
+    if role != "student":
+        with st.sidebar.expander("⏱️ STARTUP PROFILE"):
+            st.dataframe(startup_report(), use_container_width=True, hide_index=True)
+
     if models_loaded:
-        def rebuild_target(row):
-            if row["Target_Graduate"] == 1:
-                return "Graduate"
-            elif row["Target_Enrolled"] == 1:
-                return "Enrolled"
-            else:
-                return "Dropout"
+        # Drift monitor is shared by every session of this server process; rebuilt when the dataset changes
+        @st.cache_resource(max_entries=1)
+        def get_drift_monitor(_reference_df, data_path, data_version):
+            feature_cols = [c for c in _reference_df.columns if "Target" not in c and c != "Grade"]
+            return DriftMonitor(_reference_df, feature_cols, ["Dropout", "Enrolled", "Graduate"],
+                                reference_labels=_reference_df["Grade"])
+
+
+        drift_monitor = get_drift_monitor(df, data_path, os.path.getmtime(data_path))
+        # Only the fields the forms let the user set are observed; every other input column is a cohort median
+        FORM_INPUT_COLUMNS = [
+            "Age at enrollment", "Admission grade", "Gender", "Scholarship holder", "Tuition fees up to date",
+            "Curricular units 1st sem (grade)", "Curricular units 2nd sem (grade)",
+            "Unemployment rate", "Inflation rate", "GDP",
+        ]
+
+
+        # Audit log writer thread is shared by every session of this server process;
+        # EDUPREDICT_TRAFFIC_TAG marks scripted traffic (e.g. "synthetic") in the recorded source
+        @st.cache_resource
+        def get_prediction_log(db_path, source_tag):
+            return PredictionLog(db_path, source_tag=source_tag)
+
+
+        prediction_log = get_prediction_log(os.path.join(os.path.dirname(data_path), "prediction_log.db"),
+                                            os.environ.get("EDUPREDICT_TRAFFIC_TAG"))
+
 
+        # Background rescoring: on startup, when the dataset changes and every EDUPREDICT_RESCORE_INTERVAL seconds
+        @st.cache_resource
+        def get_rescoring(db_path, data_path):
+            store = AlertStore(db_path)
+            scheduler = RescoringScheduler(
+                lambda trigger: rescore_cohort(store, data_path, trigger),
+                interval_s=float(os.environ.get("EDUPREDICT_RESCORE_INTERVAL", 3600)),
+                watch_path=data_path,
+            ).start()
+            return store, scheduler
 
-        df["Grade"] = df.apply(rebuild_target, axis=1)
+
+        # Long-lived report renderer processes, started once per server
+        @st.cache_resource
+        def get_report_pool():
+            return ProcessPoolExecutor(max_workers=os.cpu_count() or 1, mp_context=multiprocessing.get_context("spawn"))
+
+
+        # Latency-budget-aware routing across the loaded classifiers; calibrated by the pre-warm thread
+        AUTO_MODEL = "Auto (latency budget)"
+        model_router = load_model_router(data_path, candidate_files)
+
+        if role != "student":
+            with st.sidebar.expander("🚦 MODEL ROUTING"):
+                st.caption(f"Budgets: {model_router.budgets_ms['interactive']:.0f} ms per interactive prediction, "
+                           f"{model_router.budgets_ms['batch']:.0f} ms per batch.")
+                st.dataframe(model_router.report(), use_container_width=True, hide_index=True)
+
+        alert_store, rescoring_scheduler = get_rescoring(os.path.join(os.path.dirname(data_path), "risk_alerts.db"),
+                                                         data_path)
 
         # Plotly Theme
         # Updated PLOT_THEME for the new dark background
@@ -473,7 +557,9 @@ if st.session_state.logged_in:
                 # Model Selector
                 if available_models:
                     with st.expander("⚙️ SYSTEM CONFIGURATION"):
-                        selected_model_name = st.selectbox("AI MODEL", list(available_models.keys()))
+                        model_choice = st.selectbox("AI MODEL", [AUTO_MODEL] + list(available_models.keys()))
+                    # Auto: the model the router would pick right now; replaced by the one that actually served
+                    selected_model_name = model_router.plan()[0][0] if model_choice == AUTO_MODEL else model_choice
                     selected_model = available_models[selected_model_name]
 
                 st.markdown("<br>", unsafe_allow_html=True)
@@ -490,17 +576,8 @@ if st.session_state.logged_in:
                     base_input = df.drop(columns=[col for col in df.columns if "Target" in col or col == "Grade"])
                     model_columns = base_input.columns.tolist()
                     input_template = pd.DataFrame(columns=model_columns)
-                    defaults = {}
-                    for col in model_columns:
-                        try:
-                            if pd.api.types.is_numeric_dtype(df[col]):
-                                defaults[col] = float(df[col].median())
-                            else:
-                                mode_series = df[col].mode()
-                                defaults[col] = mode_series.iloc[0] if not mode_series.empty else df[col].iloc[0]
-                        except Exception:
-                            defaults[col] = 0
-                    input_template.loc[0] = defaults
+                    # Cohort medians come from the running statistics, not a full-table scan
+                    input_template.loc[0] = cohort_stats.defaults(model_columns)
 
                     input_template["Age at enrollment"] = age
                     input_template["Admission grade"] = admission_grade
@@ -513,22 +590,27 @@ if st.session_state.logged_in:
                     input_template["Inflation rate"] = inflation
                     input_template["GDP"] = gdp
 
-                    # Ensure correct columns
-                    input_template = input_template[model_columns]
-
-                    # Clean types
-                    for col in input_template.columns:
-                        if pd.api.types.is_integer_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
-                            input_template[col] = np.round(input_template[col]).astype(df[col].dtype)
+                    # Ensure correct columns and the dtypes the models were trained on
+                    input_template = to_model_input(input_template[model_columns])
 
-                    prediction = selected_model.predict(input_template)[0]
-                    probabilities = selected_model.predict_proba(input_template)[0]
+                    probabilities, selected_model_name, route_reason = model_router.predict_proba(
+                        input_template, model_name=None if model_choice == AUTO_MODEL else model_choice)
+                    selected_model = available_models[selected_model_name]
+                    probabilities = probabilities[0]
+                    prediction = int(probabilities.argmax())
                     confidence = round(probabilities[prediction] * 100, 2)
                     label_map = {0: "Dropout", 1: "Enrolled", 2: "Graduate"}
                     result = label_map[prediction]
 
                     sem2_pred = trend_model.predict([[sem1_grade]])[0]
                     is_anomaly = anomaly_model.predict(input_template)[0] == -1
+                    drift_monitor.observe(input_template[FORM_INPUT_COLUMNS], selected_model_name, [prediction])
+                    prediction_log.record(role, selected_model_name, result, confidence, input_template)
+
+                    # Exact per-feature attribution, measured from the cohort average student
+                    explanation = explain(selected_model, input_template, background=cohort_stats.means())
+                    drivers = explanation.row(0, prediction, top=8)
+                    key_factors = ", ".join(drivers[drivers > 0].drop("Other features", errors="ignore").index[:3])
 
                     # Dynamic Result Styling based on Prediction (Using new color scheme)
                     if result == "Dropout":
@@ -536,7 +618,7 @@ if st.session_state.logged_in:
                         status_text = "RISK ALERT"
                         status_description = {
                             "student": "Your profile indicates significant academic challenges. Immediate consultation with a counselor is vital to prevent drop-out.",
-                            "teacher": f"This student requires high-priority academic support. Key risk factors: Low Grades (Sem 2 Pred: {round(sem2_pred, 2)}) and potential financial/economic stress.",
+                            "teacher": f"This student requires high-priority academic support. Key risk factors: {key_factors or 'no single dominant factor'} (Sem 2 Pred: {round(sem2_pred, 2)}).",
                             "counselor": "Trigger Tier 1 intervention protocol. Focus on root causes (financial aid, mental health, or academic skill deficits)."
                         }.get(role, "High risk of attrition detected.")
                     elif result == "Graduate":
@@ -577,6 +659,7 @@ if st.session_state.logged_in:
                         </div>
                     </div>
                     """, unsafe_allow_html=True)
+                    st.caption(f"Served by {selected_model_name} ({route_reason})")
 
                     # --- NEW: PROFILE RADAR ANALYSIS ---
                     col_radar, col_metrics = st.columns([1.5, 1])
@@ -630,6 +713,8 @@ if st.session_state.logged_in:
                             **PLOT_THEME
                         )
                         st.plotly_chart(fig_radar, use_container_width=True)
+                        # Kept so the chart exporter in tab 2 can include the latest profile radar
+                        st.session_state.last_radar_fig = fig_radar
 
                     with col_metrics:
                         st.markdown("##### 🔑 KEY INDICATORS")
@@ -654,57 +739,36 @@ if st.session_state.logged_in:
                         </div>
                         """, unsafe_allow_html=True)
 
+                    # --- PREDICTION EXPLANATION ---
+                    st.markdown("##### 🧩 WHY THIS PREDICTION")
+                    base_score = explanation.base[0, prediction]
+                    fig_why = go.Figure(go.Waterfall(
+                        orientation="h",
+                        y=["Cohort baseline"] + list(drivers.index) + [f"{result} score"],
+                        x=[base_score] + list(drivers.values) + [base_score + drivers.sum()],
+                        measure=["absolute"] + ["relative"] * len(drivers) + ["total"],
+                        increasing=dict(marker=dict(color=border_color)),
+                        decreasing=dict(marker=dict(color='#9e9e9e')),
+                        totals=dict(marker=dict(color=current_color)),
+                    ))
+                    fig_why.update_layout(yaxis=dict(autorange="reversed"), margin=dict(t=10, b=10, l=10, r=10),
+                                          height=360, **PLOT_THEME)
+                    st.plotly_chart(fig_why, use_container_width=True)
+                    st.caption(f"Feature contributions towards {result.upper()} ({explanation.units}). "
+                               f"Bars to the right push towards this outcome, bars to the left away from it.")
+
                     if is_anomaly:
                         st.markdown(
                             "<div style='margin-top:15px; padding:10px; background:rgba(204,76,76,0.1); border:1px solid #cc4c4c; border-radius:8px; color:#cc4c4c; text-align:center; font-weight:600;'>⚠️ ANOMALY DETECTED: DATA PATTERN IRREGULAR</div>",
                             unsafe_allow_html=True)
 
                     # Detailed Report Content
-                    report_txt = f"""
-=============================================================
-       🎓 EDUPREDICT | ACADEMIC INTELLIGENCE REPORT
-=============================================================
-
-[REPORT METADATA]
--------------------------------------------------------------
-Generated By:       {role.upper()}
-Date:               {datetime.now().strftime('%Y-%m-%d')}
-Time:               {datetime.now().strftime('%H:%M:%S')}
-System Version:     v{APP_VERSION}
-
-[STUDENT PROFILE]
--------------------------------------------------------------
-Age at Enrollment:  {age}
-Admission Grade:    {admission_grade}
-Gender:             {gender.capitalize()}
-Scholarship:        {scholarship.capitalize()}
-Tuition Status:     {'Paid' if tuition_paid == 'yes' else 'Unpaid'}
-Sem 1 Grade:        {sem1_grade}
-Sem 2 Grade:        {sem2_grade}
-
-[ECONOMIC CONTEXT]
--------------------------------------------------------------
-Unemployment Rate:  {unemployment}%
-Inflation Rate:     {inflation}%
-GDP Index:          {gdp}
-
-[ANALYSIS RESULTS]
--------------------------------------------------------------
-Predicted Outcome:  {result.upper()}
-Confidence Score:   {confidence}%
-Anomaly Detected:   {'YES' if is_anomaly else 'NO'}
-Next Sem Forecast:  {round(sem2_pred, 2)} (Estimated)
-
-[INTERVENTION NOTE]
--------------------------------------------------------------
-This report is generated by an AI model. The predictions
-are advisory. Please consult with academic counselors for
-authorized support plans.
-
-=============================================================
-© 2024 EduPredict Systems. All Rights Reserved.
-=============================================================
-"""
+                    report_txt = render_report_txt(role, {
+                        "age": age, "admission_grade": admission_grade, "gender": gender,
+                        "scholarship": scholarship, "tuition_paid": tuition_paid,
+                        "sem1_grade": sem1_grade, "sem2_grade": sem2_grade,
+                        "unemployment": unemployment, "inflation": inflation, "gdp": gdp,
+                    }, result, confidence, is_anomaly, sem2_pred, APP_VERSION)
                     st.download_button("DOWNLOAD FULL REPORT", report_txt, file_name="edu_predict_report.txt",
                                        use_container_width=True)
 
@@ -731,9 +795,8 @@ authorized support plans.
                 if available_models:
                     col_q1, col_q2 = st.columns([1, 2])
                     with col_q1:
-                        quick_model_name = st.selectbox("SELECT SIMULATION MODEL", list(available_models.keys()),
-                                                        key="quick_model")
-                        quick_model = available_models[quick_model_name]
+                        quick_model_choice = st.selectbox("SELECT SIMULATION MODEL",
+                                                          [AUTO_MODEL] + list(available_models.keys()), key="quick_model")
                     with col_q2:
                         st.empty()  # Spacer
 
@@ -762,19 +825,9 @@ authorized support plans.
                 gen_btn = st.button("🚀 RUN QUICK SIMULATION", use_container_width=True, key="gen_btn")
 
                 if gen_btn:
-                    # Use selected quick model
-                    model_to_use = quick_model if 'quick_model' in locals() else available_models[
-                        list(available_models.keys())[0]]
-
                     base_cols = df.drop(columns=[c for c in df.columns if "Target" in c or c == "Grade"]).columns
                     gen_input = pd.DataFrame(columns=base_cols)
-                    defaults = {}
-                    for col in base_cols:
-                        if pd.api.types.is_numeric_dtype(df[col]):
-                            defaults[col] = df[col].median()
-                        else:
-                            defaults[col] = df[col].mode()[0]
-                    gen_input.loc[0] = defaults
+                    gen_input.loc[0] = cohort_stats.defaults(list(base_cols))
 
                     # Map all inputs
                     gen_input["Age at enrollment"] = gen_age
@@ -789,25 +842,39 @@ authorized support plans.
                     gen_input["GDP"] = gen_gdp
 
                     # Clean types
-                    for col in gen_input.columns:
-                        if pd.api.types.is_integer_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
-                            gen_input[col] = np.round(gen_input[col]).astype(df[col].dtype)
+                    gen_input = to_model_input(gen_input)
 
-                    gen_pred = model_to_use.predict(gen_input)[0]
-                    gen_conf = round(model_to_use.predict_proba(gen_input)[0][gen_pred] * 100, 2)
+                    gen_proba, quick_model_name, quick_reason = model_router.predict_proba(
+                        gen_input, model_name=None if quick_model_choice == AUTO_MODEL else quick_model_choice)
+                    gen_pred = int(gen_proba[0].argmax())
+                    gen_conf = round(gen_proba[0][gen_pred] * 100, 2)
                     gen_res = {0: "Dropout", 1: "Enrolled", 2: "Graduate"}[gen_pred]
+                    drift_monitor.observe(gen_input[FORM_INPUT_COLUMNS], quick_model_name, [gen_pred])
+                    prediction_log.record(role, quick_model_name, gen_res, gen_conf, gen_input, source="quick")
                     color_res = "#cc4c4c" if gen_res == "Dropout" else "#6aa84f" if gen_res == "Graduate" else "#ffcc66"
 
                     st.markdown(f"""
                     <div style='margin-top: 20px; padding: 15px; border: 1px solid {color_res}; background: {color_res}15; border-radius: 10px; text-align: center;'>
                         <h2 style='margin:0; color: {color_res};'>PREDICTION: {gen_res.upper()}</h2>
                         <p style='margin:0; color: var(--text-main);'>Confidence: {gen_conf}%</p>
+                        <small style='color: var(--text-muted);'>Served by {quick_model_name} ({quick_reason})</small>
                     </div>
                     """, unsafe_allow_html=True)
                 st.markdown("</div>", unsafe_allow_html=True)
 
         # --- TAB 2: ANALYTICS ---
         with tab2:
+            # Approximate mode answers aggregates from a Course x outcome sample, so cost stays flat as the cohort grows
+            approx_mode = st.toggle("⚡ APPROXIMATE MODE", key="approx_mode",
+                                    value=cohort_stats.n >= int(os.environ.get("EDUPREDICT_APPROX_MIN_ROWS", 100_000)),
+                                    help="Answer metrics and charts from a stratified sample with confidence "
+                                         "intervals. Switch off for exact figures over every record.")
+            if approx_mode:
+                sample_per_stratum = int(os.environ.get("EDUPREDICT_SAMPLE_PER_STRATUM", 200))
+                cohort_sample = load_stratified_sample(data_path, sample_per_stratum)
+                st.caption(f"Approximate: {len(cohort_sample.rows):,} of {cohort_sample.n:,} students sampled "
+                           f"(up to {sample_per_stratum} per Course × outcome). Ranges are 95% confidence intervals.")
+
             col1, col2 = st.columns([2, 1])
             with col1:
                 st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
@@ -820,44 +887,169 @@ authorized support plans.
 
                 chart_type = st.selectbox("SELECT VISUALIZATION", chart_opts)
 
-                if "Distribution" in chart_type or "Peers" in chart_type:
-                    fig = px.pie(df, names="Grade", hole=0.5, color_discrete_sequence=PLOT_THEME['colorway'])
+                # Weighted quartiles per outcome from the sample, once per rerun; the median carries a Woodruff CI.
+                # Outcomes missing from the cohort come back as NaN and get no box.
+                admission_quartiles = {}
+                if approx_mode:
+                    for grade in OUTCOMES:
+                        in_grade = (cohort_sample.rows["Grade"] == grade).to_numpy()
+                        quartiles = [cohort_sample.quantile("Admission grade", q, in_grade)
+                                     for q in (0.0, 0.25, 0.5, 0.75, 1.0)]
+                        if not np.isnan(quartiles[2].value):
+                            admission_quartiles[grade] = quartiles
+
+
+                def build_analytics_chart(chart_type):
+                    if "Distribution" in chart_type or "Peers" in chart_type:
+                        fig = px.pie(cohort_stats.outcome_frame(), names="Grade", values="Count", hole=0.5,
+                                     color_discrete_sequence=PLOT_THEME['colorway'])
+                    elif "Trends" in chart_type:
+                        fig = px.line(
+                            df[["Curricular units 1st sem (grade)", "Curricular units 2nd sem (grade)"]].reset_index().head(
+                                100),
+                            color_discrete_sequence=PLOT_THEME['colorway'])
+                    elif approx_mode:  # "Probability" / "Risk", from precomputed box statistics
+                        fig = go.Figure()
+                        for i, (grade, (q0, q1, q2, q3, q4)) in enumerate(admission_quartiles.items()):
+                            iqr = q3.value - q1.value
+                            fig.add_trace(go.Box(
+                                name=grade, x=[grade], q1=[q1.value], median=[q2.value], q3=[q3.value],
+                                lowerfence=[max(q0.value, q1.value - 1.5 * iqr)],
+                                upperfence=[min(q4.value, q3.value + 1.5 * iqr)],
+                                marker_color=PLOT_THEME['colorway'][i % len(PLOT_THEME['colorway'])],
+                            ))
+                        fig.update_layout(xaxis_title="Grade", yaxis_title="Admission grade")
+                    else:  # "Probability" / "Risk"
+                        fig = px.box(df, x="Grade", y="Admission grade", color="Grade",
+                                     color_discrete_sequence=PLOT_THEME['colorway'])
                     fig.update_layout(**PLOT_THEME)
-                    st.plotly_chart(fig, use_container_width=True)
-                elif "Trends" in chart_type:
-                    fig = px.line(
-                        df[["Curricular units 1st sem (grade)", "Curricular units 2nd sem (grade)"]].reset_index().head(
-                            100),
-                        color_discrete_sequence=PLOT_THEME['colorway'])
-                    fig.update_layout(**PLOT_THEME)
-                    st.plotly_chart(fig, use_container_width=True)
-                elif "Probability" in chart_type or "Risk" in chart_type:
-                    fig = px.box(df, x="Grade", y="Admission grade", color="Grade",
-                                 color_discrete_sequence=PLOT_THEME['colorway'])
-                    fig.update_layout(**PLOT_THEME)
-                    st.plotly_chart(fig, use_container_width=True)
+                    return fig
+
+
+                fig = build_analytics_chart(chart_type)
+                st.plotly_chart(fig, use_container_width=True)
+                if approx_mode and ("Probability" in chart_type or "Risk" in chart_type):
+                    st.caption("Median admission grade: " + ", ".join(
+                        f"{grade} {q[2].value:.1f} ({q[2].low:.1f}–{q[2].high:.1f})"
+                        for grade, q in admission_quartiles.items()))
 
                 st.markdown("</div>", unsafe_allow_html=True)
 
             with col2:
                 st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
                 st.markdown("#### ⚡ DATA INSIGHTS", unsafe_allow_html=True)
-                st.metric("TOTAL RECORDS", df.shape[0])
-                st.metric("SUCCESS RATE", f"{len(df[df['Grade'] == 'Graduate']) / len(df) * 100:.1f}%", delta="1.2%")
-                st.metric("RISK FACTOR", f"{len(df[df['Grade'] == 'Dropout']) / len(df) * 100:.1f}%", delta="-0.5%",
-                          delta_color="inverse")
+                if approx_mode:
+                    success = cohort_sample.proportion(cohort_sample.rows["Grade"] == "Graduate")
+                    risk = cohort_sample.proportion(cohort_sample.rows["Grade"] == "Dropout")
+                    st.metric("TOTAL RECORDS", cohort_sample.n)
+                    st.metric("SUCCESS RATE", f"{success.value * 100:.1f}% ±{success.margin * 100:.1f}", delta="1.2%")
+                    st.metric("RISK FACTOR", f"{risk.value * 100:.1f}% ±{risk.margin * 100:.1f}", delta="-0.5%",
+                              delta_color="inverse")
+                else:
+                    st.metric("TOTAL RECORDS", cohort_stats.n)
+                    st.metric("SUCCESS RATE", f"{cohort_stats.outcome_rate('Graduate') * 100:.1f}%", delta="1.2%")
+                    st.metric("RISK FACTOR", f"{cohort_stats.outcome_rate('Dropout') * 100:.1f}%", delta="-0.5%",
+                              delta_color="inverse")
                 st.markdown("</div>", unsafe_allow_html=True)
 
                 st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
                 st.markdown("#### 🧠 AI CORRELATION", unsafe_allow_html=True)
-                numeric_cols = df.select_dtypes(include=[np.number]).columns.tolist()
-                if len(numeric_cols) > 1:
-                    corr = df[numeric_cols].corr().iloc[:5, :5]
+                if len(cohort_stats.columns) > 1:
+                    corr = cohort_stats.correlation().iloc[:5, :5]
                     fig_corr = px.imshow(corr, color_continuous_scale="RdBu_r")
                     fig_corr.update_layout(margin=dict(l=0, r=0, t=0, b=0), **PLOT_THEME)
                     st.plotly_chart(fig_corr, use_container_width=True)
                 st.markdown("</div>", unsafe_allow_html=True)
 
+            # --- CHART IMAGE EXPORT ---
+            with st.expander("🖼️ EXPORT CHARTS"):
+                if chart_exporter.error:
+                    st.warning(f"Chart export unavailable: {chart_exporter.error}")
+                    st.caption("Export needs kaleido and Chrome: `pip install kaleido` then "
+                               "`python -c \"import kaleido; kaleido.get_chrome_sync()\"`.")
+                else:
+                    exportable = {option: option for option in chart_opts}
+                    exportable["Correlation Heatmap"] = "corr"
+                    if st.session_state.get("last_radar_fig") is not None:
+                        exportable["Profile Radar (last analysis)"] = "radar"
+
+                    col_e1, col_e2 = st.columns([2, 1])
+                    with col_e1:
+                        export_names = st.multiselect("CHARTS", list(exportable), default=[chart_type],
+                                                      key="export_charts")
+                    with col_e2:
+                        export_fmt = st.selectbox("FORMAT", EXPORT_FORMATS, key="export_fmt", format_func=str.upper)
+
+                    if st.button("RENDER IMAGES", use_container_width=True, key="export_render",
+                                 disabled=not export_names):
+                        def _export_figure(name):
+                            source = exportable[name]
+                            if source == "corr":
+                                return fig_corr
+                            if source == "radar":
+                                return st.session_state.last_radar_fig
+                            return fig if name == chart_type else build_analytics_chart(name)
+
+                        figures = {name.lower().replace(" ", "_").replace("(", "").replace(")", ""):
+                                       _export_figure(name) for name in export_names}
+                        with st.spinner("Rendering..."):
+                            try:
+                                if len(figures) == 1:
+                                    (export_stem, export_fig), = figures.items()
+                                    st.session_state.export_file = (f"{export_stem}.{export_fmt}",
+                                                                    chart_exporter.export(export_fig, export_fmt),
+                                                                    EXPORT_MIME_TYPES[export_fmt])
+                                else:
+                                    st.session_state.export_file = ("edu_predict_charts.zip",
+                                                                    chart_exporter.export_batch(figures, export_fmt),
+                                                                    "application/zip")
+                            except Exception as e:
+                                st.error(f"Export failed: {e}")
+
+                    if st.session_state.get("export_file"):
+                        export_name, export_data, export_mime = st.session_state.export_file
+                        st.download_button(f"DOWNLOAD {export_name}", export_data, file_name=export_name,
+                                           mime=export_mime, use_container_width=True, key="export_download")
+
+            # --- INPUT DRIFT MONITOR (STAFF ONLY) ---
+            if role != "student":
+                with st.expander("📡 INPUT DRIFT MONITOR"):
+                    st.caption("Live prediction inputs vs. training distribution. "
+                               "PSI ≥ 0.1 = moderate drift, ≥ 0.25 = major drift.")
+                    feature_drift = drift_monitor.feature_report()
+                    if feature_drift.empty:
+                        st.info("No predictions observed yet.")
+                    else:
+                        st.dataframe(feature_drift, use_container_width=True, hide_index=True)
+                        st.markdown("##### PREDICTED CLASS MIX")
+                        st.dataframe(drift_monitor.prediction_report(), use_container_width=True, hide_index=True)
+
+                # --- COHORT PREDICTION DRIVERS (STAFF ONLY) ---
+                with st.expander("🧩 COHORT PREDICTION DRIVERS"):
+                    @st.cache_data(show_spinner="Explaining cohort predictions...")
+                    def cohort_drivers(model_name, data_version, _model, _cohort, _background):
+                        # Model input is built here, so a rerun with the toggle on never copies the cohort
+                        X = to_model_input(_cohort[[c for c in _cohort.columns if "Target" not in c and c != "Grade"]])
+                        contrib = explain(_model, X, background=_background)
+                        predicted = contrib.base + contrib.values.sum(axis=2)
+                        dropout = contrib.for_class(0)
+                        return pd.DataFrame({
+                            "Feature": contrib.feature_names,
+                            "Mean |Impact|": contrib.for_class(predicted.argmax(axis=1)).abs().mean().to_numpy(),
+                            "Mean Push to Dropout": dropout.mean().to_numpy(),
+                        }).sort_values("Mean |Impact|", ascending=False), contrib.units
+
+
+                    if st.toggle("Explain every student in the cohort", key="cohort_drivers"):
+                        driver_table, driver_units = cohort_drivers(selected_model_name, os.path.getmtime(data_path),
+                                                                    selected_model, df, cohort_stats.means())
+                        fig_drivers = px.bar(driver_table.head(12), x="Mean |Impact|", y="Feature", orientation="h",
+                                             color_discrete_sequence=PLOT_THEME['colorway'])
+                        fig_drivers.update_layout(yaxis=dict(autorange="reversed"), height=420, **PLOT_THEME)
+                        st.plotly_chart(fig_drivers, use_container_width=True)
+                        st.caption(f"{selected_model_name}, {len(df):,} students, contributions in {driver_units}.")
+                        st.dataframe(driver_table, use_container_width=True, hide_index=True)
+
         # --- TAB 3: RECOMMENDATION HUB (RESTYLED) ---
         with tab3:
             if role == "student":
@@ -911,8 +1103,14 @@ authorized support plans.
                 with col_t1:
                     st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
                     st.markdown(f"<h3 style='color:{current_color};'>🚨 RISK ALERTS</h3>", unsafe_allow_html=True)
-                    high_risk = df[df['Grade'] == 'Dropout']
-                    st.warning(f"⚠️ **{len(high_risk)} students identified as high-risk**")
+                    if approx_mode:
+                        high_risk = cohort_sample.rows[cohort_sample.rows['Grade'] == 'Dropout']
+                        risk_count = cohort_sample.count(cohort_sample.rows['Grade'] == 'Dropout')
+                        st.warning(f"⚠️ **≈{risk_count.value:,.0f} students identified as high-risk** "
+                                   f"(95% CI {risk_count.low:,.0f}–{risk_count.high:,.0f})")
+                    else:
+                        high_risk = df[df['Grade'] == 'Dropout']
+                        st.warning(f"⚠️ **{len(high_risk)} students identified as high-risk**")
                     if len(high_risk) > 0:
                         st.dataframe(high_risk[['Age at enrollment', 'Admission grade',
                                                 'Curricular units 1st sem (grade)']].head(5), use_container_width=True)
@@ -961,6 +1159,144 @@ authorized support plans.
                     c_b.metric("Avg GPA Target", "14.0", "0.5")
                     st.markdown("</div>", unsafe_allow_html=True)
 
+                # --- TIER CHANGE ALERT QUEUE ---
+                st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+                st.markdown(f"<h3 style='color:{current_color};'>🚨 TIER CHANGE ALERTS</h3>", unsafe_allow_html=True)
+                recent_runs = alert_store.recent_runs()
+                col_run, col_btn = st.columns([3, 1])
+                with col_run:
+                    if rescoring_scheduler.running:
+                        st.info("Rescoring in progress...")
+                    elif rescoring_scheduler.last_error:
+                        st.error(f"Last rescoring failed: {rescoring_scheduler.last_error}")
+                    if not recent_runs.empty:
+                        last = recent_runs.iloc[0]
+                        st.caption(f"Last run {last['started_at']} ({last['trigger']}) with {last['model']}: "
+                                   f"{last['rows']} students, {last['changes']} tier changes, "
+                                   f"{last['duration_s']:.2f}s")
+                with col_btn:
+                    if st.button("RESCORE NOW", use_container_width=True, key="rescore_now"):
+                        rescoring_scheduler.trigger("manual")
+                        st.toast("Rescoring queued")
+
+                col_tier, col_page = st.columns(2)
+                with col_tier:
+                    alert_tier = st.selectbox("NEW TIER", ["All", 1, 2, 3], key="alert_tier",
+                                              format_func=lambda t: t if t == "All" else f"Tier {t}")
+                alert_page_size = 20
+                _, alert_total = alert_store.alerts_page(0, 1, None if alert_tier == "All" else alert_tier)
+                with col_page:
+                    alert_page = st.number_input("PAGE", min_value=1,
+                                                 max_value=max(1, -(-alert_total // alert_page_size)),
+                                                 value=1, key="alert_page")
+                alerts_df, _ = alert_store.alerts_page(alert_page - 1, alert_page_size,
+                                                       None if alert_tier == "All" else alert_tier)
+                st.caption(f"{alert_total} alerts")
+                st.dataframe(alerts_df, use_container_width=True, hide_index=True)
+                st.markdown("</div>", unsafe_allow_html=True)
+
+                # --- BULK INTERVENTION REPORTS ---
+                st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+                st.markdown(f"<h3 style='color:{current_color};'>📦 BULK INTERVENTION REPORTS</h3>",
+                            unsafe_allow_html=True)
+                col_scope, col_pick, col_fmt = st.columns([1, 2, 1])
+                with col_scope:
+                    bulk_scope = st.radio("SCOPE", ["Course", "Risk Tier"], key="bulk_scope")
+                with col_pick:
+                    if bulk_scope == "Course":
+                        bulk_courses = st.multiselect("COURSE", list(df["Course"].cat.categories), key="bulk_courses")
+                        bulk_mask = df["Course"].isin(bulk_courses).to_numpy()
+                    else:
+                        bulk_tiers = st.multiselect("TIER", [1, 2, 3], default=[1], key="bulk_tiers",
+                                                    format_func=lambda t: f"Tier {t}")
+                        # Latest tiers from the background rescoring job
+                        stored_scores = alert_store.current_scores().reindex(range(len(df)))
+                        bulk_mask = stored_scores["tier"].isin(bulk_tiers).to_numpy()
+                with col_fmt:
+                    bulk_formats = st.multiselect("FORMAT", ["txt", "pdf"], default=["txt"], key="bulk_formats",
+                                                  format_func=str.upper)
+
+                st.caption(f"{int(bulk_mask.sum())} students selected")
+                if st.button("GENERATE REPORTS", use_container_width=True, key="bulk_generate",
+                             disabled=not bulk_mask.any() or not bulk_formats):
+                    subset = df[bulk_mask]
+                    bulk_X = to_model_input(subset[[c for c in df.columns if "Target" not in c and c != "Grade"]])
+                    if bulk_scope == "Course":
+                        bulk_proba, bulk_model_name, bulk_reason = model_router.predict_proba(bulk_X, kind="batch")
+                        bulk_results = pd.Series(bulk_proba.argmax(axis=1)).map(
+                            {0: "Dropout", 1: "Enrolled", 2: "Graduate"}).to_numpy()
+                        bulk_confidence = (bulk_proba.max(axis=1) * 100).round(2)
+                        bulk_models = [bulk_model_name] * len(subset)
+                    else:
+                        # Reports must agree with the tiers they were selected by, so reuse the stored scores
+                        stored = stored_scores[bulk_mask]
+                        bulk_results = stored["outcome"].to_numpy()
+                        bulk_confidence = (stored["confidence"] * 100).round(2).to_numpy()
+                        bulk_models = stored["model"].tolist()
+                        bulk_model_name, bulk_reason = ", ".join(stored["model"].unique()), "stored by rescoring"
+                    prediction_log.record_many(role, bulk_models, bulk_results, bulk_confidence, bulk_X,
+                                               source="bulk")
+                    bulk_records = pd.DataFrame({
+                        "student_ref": subset.index,
+                        "age": bulk_X["Age at enrollment"].to_numpy(),
+                        "admission_grade": bulk_X["Admission grade"].round(2).to_numpy(),
+                        "gender": np.where(bulk_X["Gender"] == 1, "male", "female"),
+                        "scholarship": np.where(bulk_X["Scholarship holder"] == 1, "yes", "no"),
+                        "tuition_paid": np.where(bulk_X["Tuition fees up to date"] == 1, "yes", "no"),
+                        "sem1_grade": bulk_X["Curricular units 1st sem (grade)"].round(2).to_numpy(),
+                        "sem2_grade": bulk_X["Curricular units 2nd sem (grade)"].round(2).to_numpy(),
+                        "unemployment": bulk_X["Unemployment rate"].round(2).to_numpy(),
+                        "inflation": bulk_X["Inflation rate"].round(2).to_numpy(),
+                        "gdp": bulk_X["GDP"].round(2).to_numpy(),
+                        "result": bulk_results,
+                        "confidence": bulk_confidence,
+                        "is_anomaly": anomaly_model.predict(bulk_X) == -1,
+                        "sem2_pred": trend_model.predict(bulk_X[["Curricular units 1st sem (grade)"]]),
+                    }).to_dict("records")
+
+                    bulk_progress = st.progress(0.0, text="Rendering reports...")
+                    bulk_start = time.perf_counter()
+                    zip_path = generate_bulk_reports(
+                        get_report_pool(), bulk_records, role, APP_VERSION, formats=bulk_formats,
+                        progress=lambda done, total: bulk_progress.progress(done / total,
+                                                                            text=f"Rendered {done}/{total} batches"),
+                    )
+                    with open(zip_path, "rb") as fh:
+                        st.session_state.bulk_zip = fh.read()
+                    os.remove(zip_path)
+                    st.session_state.bulk_summary = (f"{len(bulk_records)} students, "
+                                                     f"{time.perf_counter() - bulk_start:.2f}s, "
+                                                     f"scored by {bulk_model_name} ({bulk_reason})")
+
+                if st.session_state.get("bulk_zip"):
+                    st.success(f"Reports ready: {st.session_state.bulk_summary}")
+                    st.download_button("DOWNLOAD REPORTS (ZIP)", st.session_state.bulk_zip,
+                                       file_name="edu_predict_reports.zip", mime="application/zip",
+                                       use_container_width=True, key="bulk_download")
+                st.markdown("</div>", unsafe_allow_html=True)
+
+                # --- PREDICTION AUDIT TRAIL ---
+                st.markdown("<div class='glass-card'>", unsafe_allow_html=True)
+                st.markdown(f"<h3 style='color:{current_color};'>🗂️ PREDICTION AUDIT TRAIL</h3>",
+                            unsafe_allow_html=True)
+                f1, f2, f3, f4 = st.columns(4)
+                with f1:
+                    log_dates = st.date_input("DATE RANGE", value=(datetime.now().date(), datetime.now().date()),
+                                              key="log_dates")
+                with f2:
+                    log_outcomes = st.multiselect("OUTCOME", ["Dropout", "Enrolled", "Graduate"], key="log_outcomes")
+                with f3:
+                    log_roles = st.multiselect("ROLE", list(auth_users.keys()), key="log_roles")
+                with f4:
+                    log_models = st.multiselect("MODEL", prediction_log.distinct("model"), key="log_models")
+
+                log_start, log_end = (log_dates[0], log_dates[-1]) if log_dates else (None, None)
+                audit_df, audit_total = prediction_log.query(start=log_start, end=log_end, outcomes=log_outcomes,
+                                                             roles=log_roles, models=log_models)
+                st.caption(f"{audit_total} matching predictions (latest {len(audit_df)} shown)")
+                st.dataframe(audit_df, use_container_width=True, hide_index=True)
+                st.markdown("</div>", unsafe_allow_html=True)
+
     else:
         st.error("SYSTEM ERROR: MODELS NOT LOADED")
         st.code("Please verify 'data/' and 'models/' directories.")
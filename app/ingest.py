@@ -0,0 +1,49 @@
+"""Append a new semester's student records to the dataset store.
+
+    python app/ingest.py new_semester.csv [--data data/academic_cleaned.csv]
+
+Rows are appended to the cleaned CSV and folded into the running statistics
+snapshot (``<dataset>_stats.pkl``), so the cost is proportional to the batch,
+not to the size of the existing cohort.
+"""
+import argparse
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from online_stats import load_or_build_stats, outcome_labels, stats_path_for
+from schema import READ_DTYPES, apply_schema
+
+
+def ingest_batch(batch, data_path):
+    """Validate ``batch`` against the dataset header and schema, append it and update the stats."""
+    header = pd.read_csv(data_path, nrows=0).columns.tolist()
+    missing = [c for c in header if c not in batch.columns]
+    if missing:
+        raise ValueError(f"New records are missing columns: {missing}")
+    batch = batch[header]
+    records = apply_schema(batch)  # Raises before anything is appended
+
+    stats = load_or_build_stats(data_path, lambda: apply_schema(pd.read_csv(data_path, dtype=READ_DTYPES)))
+    batch.to_csv(data_path, mode="a", header=False, index=False)
+    stats.update(records.assign(Grade=outcome_labels(records)))
+    stats.save(stats_path_for(data_path))
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("batch", help="CSV of new records with the same columns as the cleaned dataset")
+    parser.add_argument("--data", default=os.path.join("data", "academic_cleaned.csv"))
+    args = parser.parse_args(argv)
+
+    stats = ingest_batch(pd.read_csv(args.batch), args.data)
+    print(f"Ingested {args.batch}: cohort now has {stats.n} records "
+          f"({stats.outcome_rate('Graduate') * 100:.1f}% graduate, {stats.outcome_rate('Dropout') * 100:.1f}% dropout)")
+
+
+if __name__ == "__main__":
+    main()
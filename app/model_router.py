@@ -0,0 +1,212 @@
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Latency budgets per request type: one interactive row, or a whole batch
+REQUEST_KINDS = ("interactive", "batch")
+DEFAULT_BUDGETS_MS = {"interactive": 50.0, "batch": 2000.0}
+
+
+def load_model_scores(report_paths=(os.path.join("reports", "model_comparison_tuned.csv"),
+                                    os.path.join("reports", "model_comparison.csv"))):
+    """F1 per deployed model name, from the comparison reports.
+
+    Names in the untuned report map to the "Baseline ..." entries of the
+    model registry, so e.g. ``Random Forest`` scores ``Baseline Random Forest``.
+    """
+    scores = {}
+    for path in report_paths:
+        if not os.path.exists(path):
+            continue
+        report = pd.read_csv(path)
+        for name, f1 in zip(report["Model"], report["F1 Score"]):
+            key = name if name.startswith("Tuned") else f"Baseline {name}"
+            scores.setdefault(key, float(f1))
+    return scores
+
+
+class LatencyTracker:
+    """Recent latencies of one (model, request kind), in ms per request or ms per row.
+
+    Samples older than ``max_age_s`` give way to newer ones, so one slow
+    measurement cannot keep a model out of rotation once it has been re-timed.
+    With no recent sample, the last known samples still stand: an idle model
+    keeps its old estimate rather than losing it.
+    """
+
+    def __init__(self, window=200, max_age_s=300.0):
+        self.samples = deque(maxlen=window)
+        self.max_age_s = max_age_s
+
+    def add(self, value):
+        self.samples.append((time.monotonic(), value))
+
+    @property
+    def last_at(self):
+        return self.samples[-1][0] if self.samples else None
+
+    def recent(self):
+        cutoff = time.monotonic() - self.max_age_s
+        return [value for at, value in self.samples if at >= cutoff]
+
+    def quantile(self, q):
+        values = self.recent() or [value for _, value in self.samples]
+        return float(np.percentile(values, q * 100)) if values else None
+
+
+class ModelRouter:
+    """Routes each prediction to the most accurate model that fits the request's latency budget.
+
+    Interactive requests are budgeted on the p95 of recent single-row
+    latencies; batch requests on the p95 per-row cost times the batch size.
+    When more than ``max_concurrent`` requests are already in flight, or no
+    model fits, the cheapest model serves instead. A model that raises is
+    skipped and the next candidate serves the request.
+
+    Models that are not being chosen are re-timed in the background every
+    ``reprobe_s`` seconds on the first ``probe_rows`` rows of the latest
+    request, so their latency stays live. A model that has never been
+    measured is tried last, never assumed to be fast.
+    """
+
+    def __init__(self, models, scores, budgets_ms=None, max_concurrent=None, window=200, max_age_s=300.0,
+                 reprobe_s=30.0, probe_rows=32):
+        self.models = dict(models)
+        self.scores = {name: scores.get(name, float("-inf")) for name in self.models}
+        self.budgets_ms = {**DEFAULT_BUDGETS_MS, **(budgets_ms or {})}
+        self.max_concurrent = max_concurrent or os.cpu_count() or 1
+        self.reprobe_s = reprobe_s
+        self.probe_rows = probe_rows
+        self._latency = {(name, kind): LatencyTracker(window, max_age_s)
+                         for name in self.models for kind in REQUEST_KINDS}
+        self._probing = set()
+        self._served = {name: 0 for name in self.models}
+        self._errors = {name: 0 for name in self.models}
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def calibrate(self, X, batch_rows=1000):
+        """Seed the trackers with one single-row and one batch timing per model."""
+        batch = X.sample(batch_rows, replace=len(X) < batch_rows, random_state=0)
+        for name, model in self.models.items():
+            model.predict_proba(X.iloc[:1])  # Warm-up, not recorded
+            for kind, rows in (("interactive", X.iloc[:1]), ("batch", batch)):
+                started = time.perf_counter()
+                model.predict_proba(rows)
+                self._record(name, kind, len(rows), (time.perf_counter() - started) * 1000)
+        return self
+
+    def _record(self, name, kind, rows, elapsed_ms):
+        with self._lock:
+            self._latency[(name, kind)].add(elapsed_ms / rows if kind == "batch" else elapsed_ms)
+
+    def estimate_ms(self, name, kind, rows=1):
+        """p95 latency estimate for a request, or None before the model has been measured."""
+        with self._lock:
+            p95 = self._latency[(name, kind)].quantile(0.95)
+        if p95 is None:
+            return None
+        return p95 * rows if kind == "batch" else p95
+
+    def _cheapest_first(self, estimates):
+        # Unmeasured models go last: an unknown latency is never taken to be the cheapest
+        return sorted(self.models, key=lambda name: (estimates[name] is None, estimates[name] or 0.0,
+                                                     -self.scores[name]))
+
+    def plan(self, kind="interactive", rows=1):
+        """Candidate models in the order they should be tried, and why the first one was chosen."""
+        if kind not in REQUEST_KINDS:
+            raise ValueError(f"Unknown request kind: {kind}")
+        with self._lock:
+            busy = self._in_flight >= self.max_concurrent
+        estimates = {name: self.estimate_ms(name, kind, rows) for name in self.models}
+        cheapest = self._cheapest_first(estimates)
+        if busy:
+            return cheapest, "under load"
+
+        budget = self.budgets_ms[kind]
+        by_score = sorted(self.models, key=lambda name: -self.scores[name])
+        # Unmeasured models never fit; the background re-probe measures them
+        fits = [name for name in by_score if estimates[name] is not None and estimates[name] <= budget]
+        if fits:
+            return fits + [name for name in cheapest if name not in fits], "within budget"
+        return cheapest, "over budget"
+
+    def predict_proba(self, X, kind="interactive", model_name=None):
+        """``(probabilities, served_by, reason)``; ``model_name`` pins a model, keeping the others as fallback."""
+        order, reason = self.plan(kind, len(X))
+        if model_name is not None:
+            order, reason = [model_name] + [name for name in order if name != model_name], "pinned"
+
+        with self._lock:
+            self._in_flight += 1
+        try:
+            for name in order:
+                started = time.perf_counter()
+                try:
+                    proba = self.models[name].predict_proba(X)
+                except Exception:
+                    with self._lock:
+                        self._errors[name] += 1
+                    reason = f"fallback after {name} failed"
+                    continue
+                self._record(name, kind, len(X), (time.perf_counter() - started) * 1000)
+                with self._lock:
+                    self._served[name] += 1
+                self._reprobe_stale(X, kind, served=name)
+                return proba, name, reason
+            raise RuntimeError("Every model failed to serve the request")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+
+    def _reprobe_stale(self, X, kind, served):
+        """Time models whose last sample is older than ``reprobe_s`` on a few rows of ``X``, off the request path."""
+        now = time.monotonic()
+        with self._lock:
+            if self._in_flight > self.max_concurrent:  # Don't add work while the server is saturated
+                return
+            stale = [name for name in self.models
+                     if name != served and (name, kind) not in self._probing
+                     and now - (self._latency[(name, kind)].last_at or 0.0) >= self.reprobe_s]
+            self._probing.update((name, kind) for name in stale)
+        for name in stale:
+            threading.Thread(target=self._probe, args=(name, kind, X.iloc[:self.probe_rows]),
+                             name=f"router-probe-{name}", daemon=True).start()
+
+    def _probe(self, name, kind, X):
+        try:
+            started = time.perf_counter()
+            self.models[name].predict_proba(X)
+            self._record(name, kind, len(X), (time.perf_counter() - started) * 1000)
+        except Exception:
+            with self._lock:
+                self._errors[name] += 1
+        finally:
+            with self._lock:
+                self._probing.discard((name, kind))
+
+    def report(self):
+        """Per-model routing summary for the dashboard."""
+        rows = []
+        for name in sorted(self.models, key=lambda n: -self.scores[n]):
+            with self._lock:
+                interactive = self._latency[(name, "interactive")]
+                batch_p95 = self._latency[(name, "batch")].quantile(0.95)
+                rows.append({
+                    "Model": name,
+                    "F1": round(self.scores[name], 4) if np.isfinite(self.scores[name]) else None,
+                    "p50 ms (1 row)": interactive.quantile(0.5),
+                    "p95 ms (1 row)": interactive.quantile(0.95),
+                    "p95 ms / 1k rows (batch)": None if batch_p95 is None else batch_p95 * 1000,
+                    "Served": self._served[name],
+                    "Errors": self._errors[name],
+                })
+        report = pd.DataFrame(rows)
+        latency_cols = [c for c in report.columns if "ms" in c]
+        report[latency_cols] = report[latency_cols].round(2)
+        return report
@@ -0,0 +1,212 @@
+import os
+
+import joblib
+import numpy as np
+import pandas as pd
+
+from schema import to_model_input
+
+OUTCOMES = ["Dropout", "Enrolled", "Graduate"]
+
+# Bumped whenever the snapshot layout changes, so stale snapshots get rebuilt
+STATS_FORMAT = 3
+
+
+def outcome_labels(frame):
+    """Vectorised equivalent of rebuilding ``Grade`` from the one-hot targets."""
+    graduate = frame["Target_Graduate"].astype(bool).to_numpy()
+    enrolled = frame["Target_Enrolled"].astype(bool).to_numpy()
+    return pd.Series(np.where(graduate, "Graduate", np.where(enrolled, "Enrolled", "Dropout")),
+                     index=frame.index, name="Grade")
+
+
+class StreamingHistogram:
+    """Bounded streaming histogram (Ben-Haim & Tom-Tov) for approximate quantiles.
+
+    Keeps at most ``max_bins`` (centroid, count) pairs. While a column has no
+    more distinct values than that, quantiles and the mode are exact; beyond
+    it the closest centroids are merged. Updates cost O(batch), not O(total).
+    """
+
+    def __init__(self, max_bins=256):
+        self.max_bins = max_bins
+        self.centroids = np.empty(0)
+        self.counts = np.empty(0)
+
+    @property
+    def n(self):
+        return float(self.counts.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values):
+            uniq, cnt = np.unique(values, return_counts=True)
+            self._absorb(uniq, cnt.astype(float))
+
+    def merge(self, other):
+        self._absorb(other.centroids, other.counts)
+
+    def _absorb(self, centroids, counts):
+        c = np.concatenate([self.centroids, centroids])
+        w = np.concatenate([self.counts, counts])
+        order = np.argsort(c, kind="mergesort")
+        c, w = c[order], w[order]
+        # Collapse exact duplicates first, then merge nearest neighbours down to budget
+        uniq, inverse = np.unique(c, return_inverse=True)
+        w = np.bincount(inverse, weights=w)
+        c = uniq
+        if len(c) > 2 * self.max_bins:
+            # Pre-compress large inputs into equal-weight groups so the merge loop stays O(max_bins^2)
+            n_groups = 2 * self.max_bins
+            position = (np.cumsum(w) - w / 2) / w.sum()
+            group = np.minimum((position * n_groups).astype(int), n_groups - 1)
+            group_w = np.bincount(group, weights=w, minlength=n_groups)
+            group_c = np.bincount(group, weights=c * w, minlength=n_groups)
+            keep = group_w > 0
+            c, w = group_c[keep] / group_w[keep], group_w[keep]
+        while len(c) > self.max_bins:
+            i = int(np.argmin(np.diff(c)))
+            total = w[i] + w[i + 1]
+            c[i] = (c[i] * w[i] + c[i + 1] * w[i + 1]) / total
+            w[i] = total
+            c = np.delete(c, i + 1)
+            w = np.delete(w, i + 1)
+        self.centroids, self.counts = c, w
+
+    def quantile(self, q):
+        if not len(self.counts):
+            return float("nan")
+        cum = np.cumsum(self.counts)
+        target = q * cum[-1]
+        i = int(np.searchsorted(cum, target, side="left"))
+        i = min(i, len(self.centroids) - 1)
+        # Linear interpolation between neighbouring centroids for the even-count median case
+        if i + 1 < len(self.centroids) and np.isclose(cum[i], target):
+            return float((self.centroids[i] + self.centroids[i + 1]) / 2)
+        return float(self.centroids[i])
+
+    def mode(self):
+        if not len(self.counts):
+            return float("nan")
+        return float(self.centroids[int(np.argmax(self.counts))])
+
+
+class RunningMoments:
+    """Count, mean and co-moment matrix with Chan et al.'s parallel batch update."""
+
+    def __init__(self, n_features):
+        self.n = 0
+        self.mean = np.zeros(n_features)
+        self.comoment = np.zeros((n_features, n_features))
+
+    def update(self, X):
+        X = np.asarray(X, dtype=float)
+        k = len(X)
+        if not k:
+            return
+        batch_mean = X.mean(axis=0)
+        centered = X - batch_mean
+        batch_comoment = centered.T @ centered
+
+        total = self.n + k
+        delta = batch_mean - self.mean
+        self.mean = self.mean + delta * (k / total)
+        self.comoment = self.comoment + batch_comoment + np.outer(delta, delta) * (self.n * k / total)
+        self.n = total
+
+    def covariance(self):
+        return self.comoment / max(self.n - 1, 1)
+
+    def correlation(self):
+        cov = self.covariance()
+        std = np.sqrt(np.diag(cov))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            corr = cov / np.outer(std, std)
+        return corr
+
+
+class CohortStats:
+    """Running statistics of the student table, updated batch by batch.
+
+    Covers everything the dashboard used to recompute from the full frame:
+    per-column medians/modes (input defaults), outcome counts and rates,
+    and the numeric correlation matrix.
+    """
+
+    def __init__(self, columns, max_bins=256):
+        self.format = STATS_FORMAT
+        self.columns = list(columns)
+        self.moments = RunningMoments(len(self.columns))
+        self.histograms = {col: StreamingHistogram(max_bins) for col in self.columns}
+        self.outcome_counts = dict.fromkeys(OUTCOMES, 0)
+
+    @classmethod
+    def from_frame(cls, frame, max_bins=256):
+        columns = [c for c in frame.columns if "Target" not in c and c != "Grade"]
+        stats = cls(columns, max_bins)
+        stats.update(frame)
+        return stats
+
+    @property
+    def n(self):
+        return self.moments.n
+
+    def update(self, batch):
+        missing = [c for c in self.columns if c not in batch.columns]
+        if missing:
+            raise ValueError(f"Batch is missing columns: {missing}")
+        values = to_model_input(batch[self.columns]).to_numpy(dtype=float)
+        self.moments.update(values)
+        for j, col in enumerate(self.columns):
+            self.histograms[col].update(values[:, j])
+
+        grades = batch["Grade"] if "Grade" in batch.columns else outcome_labels(batch)
+        for outcome, count in grades.value_counts().items():
+            self.outcome_counts[outcome] = self.outcome_counts.get(outcome, 0) + int(count)
+
+    def median(self, col):
+        return self.histograms[col].quantile(0.5)
+
+    def means(self):
+        return pd.Series(self.moments.mean, index=self.columns)
+
+    def defaults(self, columns=None):
+        """Median input for every model column, as the prediction forms expect."""
+        return {col: self.median(col) for col in (columns or self.columns)}
+
+    def outcome_rate(self, outcome):
+        total = sum(self.outcome_counts.values())
+        return self.outcome_counts.get(outcome, 0) / total if total else 0.0
+
+    def outcome_frame(self):
+        return pd.DataFrame({"Grade": list(self.outcome_counts), "Count": list(self.outcome_counts.values())})
+
+    def correlation(self):
+        return pd.DataFrame(self.moments.correlation(), index=self.columns, columns=self.columns)
+
+    def save(self, path):
+        tmp_path = f"{path}.tmp"
+        joblib.dump(self, tmp_path)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path):
+        return joblib.load(path)
+
+
+def stats_path_for(data_path):
+    root, _ = os.path.splitext(data_path)
+    return f"{root}_stats.pkl"
+
+
+def load_or_build_stats(data_path, load_frame):
+    """Stats snapshot for ``data_path``; rebuilt from ``load_frame()`` if missing, stale or of an older format."""
+    stats_path = stats_path_for(data_path)
+    if os.path.exists(stats_path) and os.path.getmtime(stats_path) >= os.path.getmtime(data_path):
+        stats = CohortStats.load(stats_path)
+        if getattr(stats, "format", None) == STATS_FORMAT:
+            return stats
+    stats = CohortStats.from_frame(load_frame())
+    stats.save(stats_path)
+    return stats
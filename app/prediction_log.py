@@ -0,0 +1,189 @@
+import atexit
+import json
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS predictions (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts          TEXT NOT NULL,
+    role        TEXT NOT NULL,
+    model       TEXT NOT NULL,
+    source      TEXT NOT NULL,
+    outcome     TEXT NOT NULL,
+    confidence  REAL,
+    inputs      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_predictions_ts ON predictions (ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_outcome ON predictions (outcome, ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_role ON predictions (role, ts);
+CREATE INDEX IF NOT EXISTS idx_predictions_model ON predictions (model, ts);
+"""
+
+_COLUMNS = ["ts", "role", "model", "source", "outcome", "confidence", "inputs"]
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value):
+    return value.item() if hasattr(value, "item") else str(value)
+
+
+def _connect(db_path):
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+class PredictionLog:
+    """Append-only prediction audit log backed by SQLite in WAL mode.
+
+    ``record`` only enqueues; a daemon thread drains the queue and writes
+    rows in batches, so the Streamlit rerun never waits on disk. A batch
+    that still fails after ``max_retries`` attempts is appended as JSON lines
+    to ``<db_path>.deadletter.jsonl`` and the writer carries on.
+
+    With ``source_tag`` set (e.g. "synthetic" for load tests), every record's
+    source is stored as ``<source>:<tag>`` so it can be told apart from real use.
+    """
+
+    def __init__(self, db_path, batch_size=200, flush_interval=1.0, max_retries=3, retry_delay=0.5,
+                 source_tag=None):
+        self.db_path = db_path
+        self.source_tag = source_tag
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.dead_letter_path = f"{db_path}.deadletter.jsonl"
+        self._queue = queue.Queue()
+
+        with _connect(db_path) as conn:
+            conn.executescript(_SCHEMA)
+        conn.close()
+
+        self._writer = threading.Thread(target=self._run, name="prediction-log-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.flush, timeout=5.0)
+
+    def record(self, role, model, outcome, confidence, inputs, source="analysis"):
+        if isinstance(inputs, pd.DataFrame):
+            inputs = inputs.iloc[0].to_dict()
+        self._queue.put((
+            datetime.now().isoformat(timespec="seconds"),
+            role,
+            model,
+            f"{source}:{self.source_tag}" if self.source_tag else source,
+            outcome,
+            None if confidence is None else float(confidence),
+            json.dumps(inputs, default=_json_default),
+        ))
+
+    def record_many(self, role, models, outcomes, confidences, inputs, source="analysis"):
+        """Queue one record per row of the ``inputs`` frame; ``models``, ``outcomes`` and ``confidences`` are per row."""
+        for model, outcome, confidence, row in zip(models, outcomes, confidences, inputs.to_dict("records")):
+            self.record(role, model, outcome, confidence, row, source)
+
+    def flush(self, timeout=None):
+        """Wait until every queued record has been handled; False if ``timeout`` seconds ran out first."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def _write(self, batch):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                conn = _connect(self.db_path)
+                try:
+                    with conn:
+                        conn.executemany(
+                            f"INSERT INTO predictions ({', '.join(_COLUMNS)}) "
+                            f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                            batch,
+                        )
+                finally:
+                    conn.close()
+                return
+            except sqlite3.Error:
+                logger.exception("Audit log write failed (attempt %d/%d, %d rows)", attempt, self.max_retries,
+                                 len(batch))
+                if attempt < self.max_retries:
+                    time.sleep(self.retry_delay * attempt)
+        self._dead_letter(batch)
+
+    def _dead_letter(self, batch):
+        try:
+            with open(self.dead_letter_path, "a", encoding="utf-8") as fh:
+                for row in batch:
+                    fh.write(json.dumps(dict(zip(_COLUMNS, row))) + "\n")
+            logger.error("Moved %d audit rows to %s", len(batch), self.dead_letter_path)
+        except OSError:
+            logger.exception("Dropped %d audit rows: dead-letter file not writable", len(batch))
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.flush_interval
+            try:
+                while len(batch) < self.batch_size:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+            except queue.Empty:
+                pass
+            try:
+                self._write(batch)
+            except Exception:  # Never let one bad batch kill the writer
+                logger.exception("Audit log writer failed on a batch of %d rows", len(batch))
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def query(self, start=None, end=None, outcomes=None, roles=None, models=None, limit=500):
+        """Up to ``limit`` matching records, newest first, plus the total number matching.
+
+        ``start``/``end`` are dates (inclusive).
+        """
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("ts >= ?")
+            params.append(f"{start}T00:00:00")
+        if end is not None:
+            clauses.append("ts <= ?")
+            params.append(f"{end}T23:59:59")
+        for column, values in (("outcome", outcomes), ("role", roles), ("model", models)):
+            if values:
+                clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = _connect(self.db_path)
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM predictions {where}", params).fetchone()[0]
+            rows = pd.read_sql_query(
+                f"SELECT {', '.join(_COLUMNS)} FROM predictions {where} ORDER BY ts DESC, id DESC LIMIT ?",
+                conn,
+                params=params + [int(limit)],
+            )
+        finally:
+            conn.close()
+        return rows, total
+
+    def distinct(self, column):
+        if column not in ("role", "model", "outcome"):
+            raise ValueError(f"Unsupported column: {column}")
+        conn = _connect(self.db_path)
+        try:
+            return [row[0] for row in conn.execute(f"SELECT DISTINCT {column} FROM predictions ORDER BY 1")]
+        finally:
+            conn.close()
@@ -0,0 +1,184 @@
+import time
+
+_module_started = time.perf_counter()
+
+import importlib
+import os
+import threading
+
+import joblib
+import pandas as pd
+
+from approx_stats import StratifiedSample
+from model_router import ModelRouter, load_model_scores
+from online_stats import OUTCOMES, load_or_build_stats, outcome_labels, stats_path_for
+from schema import READ_DTYPES, apply_schema, to_model_input
+
+# Module state lives for the whole server process: Streamlit re-executes the
+# page script on every rerun, but imported modules stay in sys.modules.
+_cache = {}
+_locks = {}
+_registry_lock = threading.Lock()
+_prewarm_thread = None
+
+# This module's own imports (joblib, the stats and routing modules) are timed too, since the app imports it eagerly
+IMPORT_TIMINGS = {"preload": time.perf_counter() - _module_started}
+LOAD_TIMINGS = {}
+
+# --- MODEL REGISTRY ---
+MODELS_DIR = "models"
+ANOMALY_MODEL_FILE = "anomaly_model.pkl"
+TREND_MODEL_FILE = "trend_model.pkl"
+CANDIDATE_MODEL_FILES = [
+    ("Tuned Logistic Regression", "tuned_logistic_regression_model.pkl"),
+    ("Tuned Random Forest", "tuned_random_forest_model.pkl"),
+    ("Tuned XGBoost", "tuned_xgboost_model.pkl"),
+    ("Baseline Random Forest", "rf_model.pkl"),
+]
+LABEL_MAP = {0: "Dropout", 1: "Enrolled", 2: "Graduate"}
+
+
+def _key_lock(key):
+    with _registry_lock:
+        return _locks.setdefault(key, threading.Lock())
+
+
+def _cached(key, loader, version=None):
+    """Load ``key`` once per process; concurrent callers wait for the first load.
+
+    A changed ``version`` (e.g. a file mtime) replaces the cached value.
+    """
+    entry = _cache.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    with _key_lock(key):
+        entry = _cache.get(key)
+        if entry is None or entry[0] != version:
+            start = time.perf_counter()
+            entry = _cache[key] = (version, loader())
+            LOAD_TIMINGS[key] = time.perf_counter() - start
+    return entry[1]
+
+
+def timed_import(name):
+    """Import a module on first use and record how long the import took."""
+    def _import():
+        start = time.perf_counter()
+        module = importlib.import_module(name)
+        IMPORT_TIMINGS[name] = time.perf_counter() - start
+        return module
+
+    return _cached(("import", name), _import)
+
+
+def load_dataset(path):
+    """Cleaned student table in the compact schema, with the ``Grade`` label rebuilt.
+
+    Shared by every session, treat as read-only.
+    """
+    def _load():
+        df = apply_schema(pd.read_csv(path, dtype=READ_DTYPES))
+        df["Grade"] = pd.Categorical(outcome_labels(df), categories=OUTCOMES)
+        return df
+
+    return _cached(("dataset", os.path.abspath(path)), _load, version=os.path.getmtime(path))
+
+
+def load_cohort_stats(data_path):
+    """Running statistics for the dataset, rebuilt only if the snapshot is older than the data."""
+    return _cached(("stats", os.path.abspath(stats_path_for(data_path))),
+                   lambda: load_or_build_stats(data_path, lambda: load_dataset(data_path)),
+                   version=os.path.getmtime(data_path))
+
+
+def load_stratified_sample(data_path, per_stratum=200):
+    """Course x outcome sample of the dataset for approximate analytics, redrawn when the data changes."""
+    return _cached(("sample", os.path.abspath(data_path), per_stratum),
+                   lambda: StratifiedSample.from_csv(data_path, per_stratum=per_stratum),
+                   version=os.path.getmtime(data_path))
+
+
+def load_model_or_none(path):
+    if not os.path.exists(path):
+        return None
+    return _cached(("model", os.path.abspath(path)), lambda: joblib.load(path))
+
+
+def load_model_router(data_path, candidate_files):
+    """Latency router over the available ``(name, path)`` classifiers, shared by every session.
+
+    Calibrated on the first 1000 students only, so building it never copies
+    the whole cohort. Budgets come from ``EDUPREDICT_BUDGET_INTERACTIVE_MS``
+    and ``EDUPREDICT_BUDGET_BATCH_MS``.
+    """
+    models = {name: load_model_or_none(path) for name, path in candidate_files}
+    models = {name: model for name, model in models.items() if model is not None}
+
+    def _load():
+        calibration = load_dataset(data_path).head(1000)
+        calibration = to_model_input(calibration[[c for c in calibration.columns
+                                                  if "Target" not in c and c != "Grade"]])
+        return ModelRouter(models, load_model_scores(), budgets_ms={
+            "interactive": float(os.environ.get("EDUPREDICT_BUDGET_INTERACTIVE_MS", 50)),
+            "batch": float(os.environ.get("EDUPREDICT_BUDGET_BATCH_MS", 2000)),
+        }).calibrate(calibration)
+
+    return _cached(("router", os.path.abspath(data_path), tuple(models)), _load)
+
+
+def _warm_plotly():
+    """Build and serialise a throwaway figure: plotly sets up templates and validators lazily, on first use."""
+    px = timed_import("plotly.express")
+    px.pie(names=["a", "b"], values=[1, 2], hole=0.5).update_layout(paper_bgcolor="rgba(0,0,0,0)").to_json()
+
+
+def _prewarm(data_path, model_paths, candidate_files, modules):
+    for name in modules:
+        try:
+            timed_import(name)
+        except ImportError:
+            pass
+    try:
+        _cached(("warm-up", "plotly figure"), _warm_plotly)
+    except ImportError:
+        pass
+    try:
+        load_dataset(data_path)
+        load_cohort_stats(data_path)
+    except Exception:
+        pass  # The page reports loading errors when it retries in the foreground
+    for path in model_paths:
+        try:
+            load_model_or_none(path)
+        except Exception:
+            pass
+    try:
+        load_model_router(data_path, candidate_files)
+    except Exception:
+        pass
+
+
+def start_prewarm(data_path, model_paths, candidate_files=(),
+                  modules=("plotly.express", "plotly.graph_objects", "xgboost")):
+    """Warm imports, a first figure, dataset, models and the router on a background thread, once per process."""
+    global _prewarm_thread
+    if os.environ.get("EDUPREDICT_PREWARM", "1") == "0":
+        return
+    with _registry_lock:
+        if _prewarm_thread is not None:
+            return
+        _prewarm_thread = threading.Thread(
+            target=_prewarm, args=(data_path, list(model_paths), list(candidate_files), list(modules)),
+            name="edupredict-prewarm", daemon=True,
+        )
+        _prewarm_thread.start()
+
+
+def startup_report():
+    """Import and load timings recorded so far, slowest first."""
+    rows = [("import", name, secs) for name, secs in IMPORT_TIMINGS.items()]
+    rows += [(kind, os.path.basename(target), secs)
+             for (kind, target, *_), secs in LOAD_TIMINGS.items() if kind != "import"]
+    report = pd.DataFrame(rows, columns=["Stage", "Target", "Seconds"])
+    report["Seconds"] = report["Seconds"].round(3)
+    return report.sort_values("Seconds", ascending=False).reset_index(drop=True)
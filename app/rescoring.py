@@ -0,0 +1,257 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+import pandas as pd
+
+from preload import CANDIDATE_MODEL_FILES, LABEL_MAP, MODELS_DIR, load_dataset, load_model_or_none
+from schema import to_model_input
+
+# Counselor intervention tiers (see the STRATEGIC FRAMEWORK card)
+TIER_BY_OUTCOME = {"Dropout": 1, "Enrolled": 2, "Graduate": 3}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS student_tiers (
+    row_id      INTEGER PRIMARY KEY,
+    tier        INTEGER NOT NULL,
+    outcome     TEXT NOT NULL,
+    confidence  REAL NOT NULL,
+    run_id      INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tier_alerts (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id      INTEGER NOT NULL,
+    created_at  TEXT NOT NULL,
+    row_id      INTEGER NOT NULL,
+    old_tier    INTEGER,
+    new_tier    INTEGER NOT NULL,
+    outcome     TEXT NOT NULL,
+    confidence  REAL NOT NULL,
+    model       TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_tier_alerts_tier ON tier_alerts (new_tier, id);
+CREATE TABLE IF NOT EXISTS rescoring_runs (
+    id          INTEGER PRIMARY KEY AUTOINCREMENT,
+    started_at  TEXT NOT NULL,
+    trigger     TEXT NOT NULL,
+    model       TEXT NOT NULL,
+    rows        INTEGER NOT NULL,
+    changes     INTEGER NOT NULL,
+    duration_s  REAL NOT NULL
+);
+"""
+
+
+def best_model_name(available_names, comparison_path=os.path.join("reports", "model_comparison_tuned.csv")):
+    """Highest-F1 model from the tuned comparison report that is actually available."""
+    if os.path.exists(comparison_path):
+        ranking = pd.read_csv(comparison_path).sort_values("F1 Score", ascending=False)["Model"]
+        for name in ranking:
+            if name in available_names:
+                return name
+    return available_names[0] if available_names else None
+
+
+class AlertStore:
+    """Persisted per-student tiers, the tier-change alert queue and the run history (SQLite)."""
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        conn = self._connect()
+        try:
+            conn.executescript(_SCHEMA)
+        finally:
+            conn.close()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.db_path, timeout=30)
+        conn.execute("PRAGMA journal_mode=WAL")
+        return conn
+
+    def previous_tiers(self):
+        conn = self._connect()
+        try:
+            return pd.read_sql_query("SELECT row_id, tier FROM student_tiers", conn).set_index("row_id")["tier"]
+        finally:
+            conn.close()
+
+    def current_scores(self):
+        """Latest tier, outcome, confidence (0-1) and scoring model per student, indexed by row_id."""
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(
+                "SELECT t.row_id, t.tier, t.outcome, t.confidence, r.model FROM student_tiers t "
+                "JOIN rescoring_runs r ON r.id = t.run_id", conn,
+            ).set_index("row_id")
+        finally:
+            conn.close()
+
+    def record_run(self, started_at, trigger, model, scored):
+        """Diff ``scored`` (row_id, tier, outcome, confidence) against the stored tiers and persist.
+
+        The very first run only records a baseline. Later runs queue an alert
+        for each student whose tier changed, and for each new student who
+        lands in Tier 1.
+        """
+        previous = self.previous_tiers()
+        merged = scored.join(previous.rename("old_tier"), on="row_id")
+        if previous.empty:
+            changed = merged.iloc[0:0]
+        else:
+            is_new = merged["old_tier"].isna()
+            changed = merged[(~is_new & (merged["old_tier"] != merged["tier"])) | (is_new & (merged["tier"] == 1))]
+
+        conn = self._connect()
+        try:
+            with conn:
+                run_id = conn.execute(
+                    "INSERT INTO rescoring_runs (started_at, trigger, model, rows, changes, duration_s) "
+                    "VALUES (?, ?, ?, ?, ?, ?)",
+                    (started_at, trigger, model, len(scored), len(changed), 0.0),
+                ).lastrowid
+                conn.executemany(
+                    "INSERT INTO tier_alerts (run_id, created_at, row_id, old_tier, new_tier, outcome, confidence, model) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    [(run_id, started_at, int(r.row_id), None if pd.isna(r.old_tier) else int(r.old_tier),
+                      int(r.tier), r.outcome, float(r.confidence), model)
+                     for r in changed.itertuples(index=False)],
+                )
+                conn.executemany(
+                    "INSERT OR REPLACE INTO student_tiers (row_id, tier, outcome, confidence, run_id) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    [(int(r.row_id), int(r.tier), r.outcome, float(r.confidence), run_id)
+                     for r in scored.itertuples(index=False)],
+                )
+        finally:
+            conn.close()
+        return run_id, len(changed)
+
+    def set_duration(self, run_id, duration_s):
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("UPDATE rescoring_runs SET duration_s = ? WHERE id = ?", (duration_s, run_id))
+        finally:
+            conn.close()
+
+    def alerts_page(self, page=0, page_size=20, tier=None):
+        """One page of alerts, newest first, plus the total number matching."""
+        where, params = ("WHERE new_tier = ?", [int(tier)]) if tier else ("", [])
+        conn = self._connect()
+        try:
+            total = conn.execute(f"SELECT COUNT(*) FROM tier_alerts {where}", params).fetchone()[0]
+            rows = pd.read_sql_query(
+                f"SELECT created_at, row_id, old_tier, new_tier, outcome, confidence, model FROM tier_alerts "
+                f"{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                conn, params=params + [int(page_size), int(page) * int(page_size)],
+            )
+        finally:
+            conn.close()
+        return rows, total
+
+    def recent_runs(self, limit=5):
+        conn = self._connect()
+        try:
+            return pd.read_sql_query(
+                "SELECT started_at, trigger, model, rows, changes, duration_s FROM rescoring_runs "
+                "ORDER BY id DESC LIMIT ?", conn, params=[int(limit)],
+            )
+        finally:
+            conn.close()
+
+
+def rescore_cohort(store, data_path, trigger, models_dir=MODELS_DIR):
+    """Score the whole cohort with the current best model and push tier changes to ``store``."""
+    started = time.perf_counter()
+    started_at = datetime.now().isoformat(timespec="seconds")
+
+    available = {name: load_model_or_none(os.path.join(models_dir, filename))
+                 for name, filename in CANDIDATE_MODEL_FILES}
+    available = {name: model for name, model in available.items() if model is not None}
+    model_name = best_model_name(list(available))
+    if model_name is None:
+        raise RuntimeError("No classifier available for rescoring")
+
+    df = load_dataset(data_path)
+    features = [c for c in df.columns if "Target" not in c and c != "Grade"]
+    proba = available[model_name].predict_proba(to_model_input(df[features]))
+    outcomes = pd.Series(proba.argmax(axis=1)).map(LABEL_MAP)
+    scored = pd.DataFrame({
+        "row_id": range(len(df)),
+        "tier": outcomes.map(TIER_BY_OUTCOME).to_numpy(),
+        "outcome": outcomes.to_numpy(),
+        "confidence": proba.max(axis=1),
+    })
+
+    run_id, changes = store.record_run(started_at, trigger, model_name, scored)
+    duration = time.perf_counter() - started
+    store.set_duration(run_id, duration)
+    return {"model": model_name, "rows": len(scored), "changes": changes, "duration_s": duration}
+
+
+class RescoringScheduler:
+    """Runs rescoring jobs on one background thread: periodically, when the data file changes, or on demand.
+
+    Jobs run strictly one at a time; triggers that arrive while a job is
+    running are coalesced into a single follow-up run.
+    """
+
+    def __init__(self, job, interval_s=3600, watch_path=None, poll_s=15):
+        self.job = job
+        self.interval_s = interval_s
+        self.watch_path = watch_path
+        self.poll_s = poll_s
+        self.running = False
+        self.last_result = None
+        self.last_error = None
+        self._wake = threading.Event()
+        self._lock = threading.Lock()
+        self._pending_trigger = "startup"
+        self._last_run = 0.0
+        self._watched_mtime = self._mtime()
+        self._thread = threading.Thread(target=self._loop, name="rescoring-scheduler", daemon=True)
+
+    def _mtime(self):
+        if self.watch_path and os.path.exists(self.watch_path):
+            return os.path.getmtime(self.watch_path)
+        return None
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def trigger(self, reason="manual"):
+        with self._lock:
+            self._pending_trigger = reason
+        self._wake.set()
+
+    def _due_trigger(self):
+        with self._lock:
+            reason, self._pending_trigger = self._pending_trigger, None
+        if reason:
+            return reason
+        mtime = self._mtime()
+        if mtime != self._watched_mtime:
+            self._watched_mtime = mtime
+            return "data change"
+        if self.interval_s and time.monotonic() - self._last_run >= self.interval_s:
+            return "schedule"
+        return None
+
+    def _loop(self):
+        while True:
+            reason = self._due_trigger()
+            if reason:
+                self.running = True
+                try:
+                    self.last_result = self.job(reason)
+                    self.last_error = None
+                except Exception as e:
+                    self.last_error = f"{type(e).__name__}: {e}"
+                finally:
+                    self.running = False
+                    self._last_run = time.monotonic()
+            self._wake.wait(self.poll_s)
+            self._wake.clear()
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+
+# --- STUDENT TABLE SCHEMA ---
+# Coded columns: a few dozen institution codes each, kept as categoricals
+CODED_COLUMNS = [
+    "Marital Status",
+    "Application mode",
+    "Course",
+    "Previous qualification",
+    "Nacionality",
+    "Mother's qualification",
+    "Father's qualification",
+    "Mother's occupation",
+    "Father's occupation",
+]
+
+# 0/1 indicators
+FLAG_COLUMNS = [
+    "Daytime/evening attendance",
+    "Displaced",
+    "Educational special needs",
+    "Debtor",
+    "Tuition fees up to date",
+    "Gender",
+    "Scholarship holder",
+    "International",
+]
+
+# Small counts, held as int8 (values outside -128..127 are rejected on load)
+SMALL_INT_COLUMNS = [
+    "Application order",
+    "Age at enrollment",
+    "Curricular units 1st sem (credited)",
+    "Curricular units 1st sem (enrolled)",
+    "Curricular units 1st sem (evaluations)",
+    "Curricular units 1st sem (approved)",
+    "Curricular units 1st sem (without evaluations)",
+    "Curricular units 2nd sem (credited)",
+    "Curricular units 2nd sem (enrolled)",
+    "Curricular units 2nd sem (evaluations)",
+    "Curricular units 2nd sem (approved)",
+    "Curricular units 2nd sem (without evaluations)",
+]
+
+# Grades and economic indicators
+FLOAT_COLUMNS = [
+    "Previous qualification (grade)",
+    "Admission grade",
+    "Curricular units 1st sem (grade)",
+    "Curricular units 2nd sem (grade)",
+    "Unemployment rate",
+    "Inflation rate",
+    "GDP",
+]
+
+TARGET_COLUMNS = ["Target_Enrolled", "Target_Graduate"]
+
+# Resident dtypes once a frame has gone through apply_schema
+STUDENT_SCHEMA = {
+    **{col: "category" for col in CODED_COLUMNS},
+    **{col: "bool" for col in FLAG_COLUMNS + TARGET_COLUMNS},
+    **{col: "int8" for col in SMALL_INT_COLUMNS},
+    **{col: "float32" for col in FLOAT_COLUMNS},
+}
+
+# Narrow parse-time dtypes for pd.read_csv, so loading never materialises int64/float64 columns.
+# Flags and counts are parsed as float32 rather than int8: pandas wraps out-of-range integers
+# silently, while float32 holds every int8 value exactly, so apply_schema can reject bad values.
+READ_DTYPES = {
+    **{col: "int16" for col in CODED_COLUMNS},
+    **{col: "float32" for col in FLAG_COLUMNS + SMALL_INT_COLUMNS},
+    **{col: "float32" for col in FLOAT_COLUMNS},
+    **{col: "bool" for col in TARGET_COLUMNS},
+}
+
+# What the pickled models were trained on (the original CSV dtypes)
+MODEL_DTYPES = {
+    **{col: "int64" for col in CODED_COLUMNS + FLAG_COLUMNS + SMALL_INT_COLUMNS},
+    **{col: "float64" for col in FLOAT_COLUMNS},
+}
+
+
+def _check_values(col, values, dtype):
+    """Raise on values ``dtype`` cannot hold, instead of letting the cast wrap or coerce them."""
+    if values.isna().any():
+        raise ValueError(f"Column {col!r} has missing values")
+    if dtype not in ("int8", "bool") or str(values.dtype) == dtype:
+        return
+    lo, hi = (0, 1) if dtype == "bool" else (np.iinfo(dtype).min, np.iinfo(dtype).max)
+    numbers = values.astype("float64")
+    bad = values[(numbers < lo) | (numbers > hi) | (numbers != np.round(numbers))]
+    if len(bad):
+        raise ValueError(f"Column {col!r} has values {sorted(bad.unique().tolist())[:5]} that do not fit "
+                         f"the {dtype} schema (allowed: integers {lo}..{hi})")
+
+
+def apply_schema(frame):
+    """Cast known columns of ``frame`` to the compact resident dtypes. Unknown columns are left alone.
+
+    Raises ValueError on missing values, and on flags or counts that the
+    narrow dtypes cannot represent, before anything is cast.
+    """
+    for col, dtype in STUDENT_SCHEMA.items():
+        if col in frame.columns:
+            _check_values(col, frame[col], dtype)
+    frame = frame.copy()
+    for col, dtype in STUDENT_SCHEMA.items():
+        if col not in frame.columns or str(frame[col].dtype) == dtype:
+            continue
+        if dtype == "bool":
+            frame[col] = frame[col].astype("int8")
+        frame[col] = frame[col].astype(dtype)
+    return frame
+
+
+def to_model_input(frame):
+    """Cast known columns back to the int64/float64 dtypes the models were fitted on.
+
+    Integer columns are rounded first, so slider floats land on valid codes.
+    """
+    frame = frame.copy()
+    for col in frame.columns:
+        dtype = MODEL_DTYPES.get(col)
+        if dtype is None:
+            continue
+        values = frame[col].astype("float64")
+        frame[col] = np.round(values).astype(dtype) if dtype == "int64" else values
+    return frame
@@ -0,0 +1,189 @@
+"""Out-of-core batch scoring of the full student history.
+
+    python app/score_cohort.py data/academic_cleaned.csv --out reports/scores --workers 8
+
+The input (CSV or Parquet) is read one partition at a time and the partitions
+are fanned out to a process pool. Each worker loads the models from
+``models/`` once, scores its partition with every available classifier, the
+Isolation Forest and the trend model, and writes ``part-NNNNN.parquet``
+itself. At most ``2 x workers`` partitions are in flight, so peak memory is
+set by ``--partition-rows``, not by the size of the dataset.
+
+Parts are written to a staging directory and swapped into ``--out`` when the
+run finishes, replacing any earlier run's parts. An ``--out`` holding other
+files is refused.
+"""
+import argparse
+import multiprocessing
+import os
+import re
+import shutil
+import sys
+import tempfile
+import time
+import warnings
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from preload import (ANOMALY_MODEL_FILE, CANDIDATE_MODEL_FILES, LABEL_MAP, MODELS_DIR, TREND_MODEL_FILE,
+                     load_model_or_none)
+from schema import READ_DTYPES, apply_schema, to_model_input
+
+TREND_FEATURE = "Curricular units 1st sem (grade)"
+
+# Per-worker state, filled once by _init_worker
+_models = {}
+_feature_columns = None
+_out_dir = None
+
+
+def _slug(name):
+    return re.sub(r"[^a-z0-9]+", "_", name.lower()).strip("_")
+
+
+def _single_threaded(model):
+    # Parallelism comes from the process pool; nested thread pools just oversubscribe cores
+    if hasattr(model, "get_params") and "n_jobs" in model.get_params():
+        model.set_params(n_jobs=1)
+    return model
+
+
+def _init_worker(models_dir, feature_columns, out_dir):
+    global _feature_columns, _out_dir
+    warnings.filterwarnings("ignore", category=UserWarning)
+    _feature_columns = feature_columns
+    _out_dir = out_dir
+    for name, filename in CANDIDATE_MODEL_FILES:
+        model = load_model_or_none(os.path.join(models_dir, filename))
+        if model is not None:
+            _models[name] = _single_threaded(model)
+    _models["anomaly"] = _single_threaded(load_model_or_none(os.path.join(models_dir, ANOMALY_MODEL_FILE)))
+    _models["trend"] = load_model_or_none(os.path.join(models_dir, TREND_MODEL_FILE))
+
+
+def score_partition(part):
+    """Score one partition of feature rows; returns the result columns as a DataFrame."""
+    X = to_model_input(part[_feature_columns])
+    out = pd.DataFrame({"row_id": part.index.to_numpy()})
+    for name, model in _models.items():
+        if name in ("anomaly", "trend") or model is None:
+            continue
+        proba = model.predict_proba(X)
+        predicted = proba.argmax(axis=1)
+        out[f"{_slug(name)}_outcome"] = pd.Categorical.from_codes(predicted, list(LABEL_MAP.values()))
+        out[f"{_slug(name)}_confidence"] = proba.max(axis=1).astype(np.float32)
+    if _models.get("anomaly") is not None:
+        out["is_anomaly"] = _models["anomaly"].predict(X) == -1
+    if _models.get("trend") is not None:
+        out["sem2_forecast"] = _models["trend"].predict(X[[TREND_FEATURE]]).astype(np.float32)
+    return out
+
+
+def _score_and_write(part_no, part):
+    scored = score_partition(part)
+    scored.to_parquet(os.path.join(_out_dir, f"part-{part_no:05d}.parquet"), index=False)
+    return part_no, len(scored)
+
+
+def _partitions(path, partition_rows):
+    """Yield ``(part_no, frame)`` of at most ``partition_rows`` rows without materialising the whole input."""
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        # Batches rather than row groups: one row group can hold the whole file
+        batches = pq.ParquetFile(path).iter_batches(batch_size=partition_rows,
+                                                    columns=_feature_columns_of(path))
+        frames = (batch.to_pandas() for batch in batches)
+    else:
+        frames = pd.read_csv(path, chunksize=partition_rows, dtype=READ_DTYPES)
+    offset = 0
+    for part_no, chunk in enumerate(frames):
+        chunk = apply_schema(chunk)  # Validates the partition before it reaches a worker
+        chunk.index = pd.RangeIndex(offset, offset + len(chunk))
+        offset += len(chunk)
+        yield part_no, chunk
+
+
+def _feature_columns_of(path):
+    if path.endswith(".parquet"):
+        import pyarrow.parquet as pq
+
+        columns = pq.ParquetFile(path).schema_arrow.names
+    else:
+        columns = pd.read_csv(path, nrows=0).columns.tolist()
+    return [c for c in columns if "Target" not in c and c != "Grade"]
+
+
+def _check_out_dir(out_dir):
+    """``out_dir`` may be missing, empty, or hold a previous run's parts; anything else is left alone."""
+    if os.path.isdir(out_dir):
+        foreign = [name for name in os.listdir(out_dir) if not re.fullmatch(r"part-\d{5}\.parquet", name)]
+        if foreign:
+            raise FileExistsError(f"{out_dir} contains files that are not scoring output: {foreign[:5]}")
+    elif os.path.exists(out_dir):
+        raise FileExistsError(f"{out_dir} exists and is not a directory")
+
+
+def _publish(staging_dir, out_dir):
+    """Swap the finished run into ``out_dir``, replacing the previous run's parts."""
+    previous = None
+    if os.path.isdir(out_dir):
+        previous = tempfile.mkdtemp(prefix=".previous-", dir=os.path.dirname(os.path.abspath(out_dir)))
+        os.rmdir(previous)
+        os.rename(out_dir, previous)
+    os.rename(staging_dir, out_dir)
+    if previous:
+        shutil.rmtree(previous)
+
+
+def score_cohort(input_path, out_dir, workers=None, partition_rows=100_000, models_dir=MODELS_DIR):
+    workers = workers or os.cpu_count() or 1
+    _check_out_dir(out_dir)
+    parent = os.path.dirname(os.path.abspath(out_dir))
+    os.makedirs(parent, exist_ok=True)
+    # Parts are written to a staging directory next to out_dir, so a rerun never mixes with old parts
+    staging_dir = tempfile.mkdtemp(prefix=f".{os.path.basename(os.path.abspath(out_dir))}-", dir=parent)
+    for var in ("OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS"):
+        os.environ.setdefault(var, "1")  # Inherited by the spawned workers
+
+    ctx = multiprocessing.get_context("spawn")
+    start = time.perf_counter()
+    rows = 0
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(models_dir, _feature_columns_of(input_path), staging_dir)) as pool:
+            pending = set()
+            for part_no, part in _partitions(input_path, partition_rows):
+                # Back-pressure: never read far ahead of the workers
+                if len(pending) >= 2 * workers:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    rows += sum(f.result()[1] for f in done)
+                pending.add(pool.submit(_score_and_write, part_no, part))
+            rows += sum(f.result()[1] for f in wait(pending).done)
+        _publish(staging_dir, out_dir)
+    finally:
+        shutil.rmtree(staging_dir, ignore_errors=True)
+    elapsed = time.perf_counter() - start
+    return rows, elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("input", help="student table (.csv or .parquet)")
+    parser.add_argument("--out", default=os.path.join("reports", "scores"), help="output directory for Parquet parts")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--partition-rows", type=int, default=100_000,
+                        help="rows per partition (CSV chunks or Parquet batches)")
+    parser.add_argument("--models", default=MODELS_DIR, help="directory containing the .pkl models")
+    args = parser.parse_args(argv)
+
+    rows, elapsed = score_cohort(args.input, args.out, args.workers, args.partition_rows, args.models)
+    print(f"Scored {rows} rows in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s) -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
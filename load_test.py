@@ -0,0 +1,193 @@
+"""Concurrent-session load test for the EduPredict Streamlit app.
+
+Drives N scripted sessions of ``app/edu_predict_app.py`` at once through
+Streamlit's AppTest (no browser, no server) and reports rerun latency
+percentiles, throughput and peak RSS for each concurrency level.
+
+Each worker process starts with cold caches, so the first ``open`` and
+``login`` runs are reported separately as cold-start times; the latency
+percentiles and throughput cover the steady-state reruns that follow.
+
+AppTest keeps a process-wide runtime singleton, so every session runs in its
+own worker process; the numbers describe N sessions competing for this
+machine's CPU and memory.
+
+The sessions run against a scratch copy of ``data/`` (without its SQLite
+stores), so the audit log, alert queue and stats snapshot of the real data
+directory are never touched. Their predictions are recorded with a
+``:synthetic`` source tag.
+
+    python load_test.py --sessions 1 2 4 8 --iterations 3
+"""
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from streamlit.testing.v1 import AppTest
+
+try:
+    import psutil
+except ImportError:  # Optional: falls back to the process high-water mark
+    psutil = None
+
+APP_PATH = os.path.join("app", "edu_predict_app.py")
+DATA_DIR = "data"
+COLD_STEPS = ("open", "login")
+CREDENTIALS = {
+    "student": "studentpass",
+    "teacher": "teacherpass",
+    "counselor": "counselpass",
+}
+
+
+class RssSampler(threading.Thread):
+    """Samples resident memory in the background and keeps the peak."""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.peak_mb = 0.0
+        self._done = threading.Event()
+
+    def _rss_mb(self):
+        if psutil is not None:
+            return psutil.Process().memory_info().rss / 1024 ** 2
+        import resource  # Unix only
+
+        # ru_maxrss is KiB on Linux, bytes on macOS
+        scale = 1024 ** 2 if sys.platform == "darwin" else 1024
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+    def run(self):
+        while not self._done.is_set():
+            self.peak_mb = max(self.peak_mb, self._rss_mb())
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+        self.peak_mb = max(self.peak_mb, self._rss_mb())
+
+
+def _timed_run(at, step, samples, timeout):
+    start = time.perf_counter()
+    at.run(timeout=timeout)
+    samples.append((step, time.perf_counter() - start))
+    if at.exception:
+        raise RuntimeError(f"{step}: {at.exception[0].value}")
+
+
+def _find(elements, label):
+    return next(e for e in elements if e.label == label)
+
+
+def run_session(role, iterations, timeout):
+    """One scripted user: login, move sliders, analyse, flip through tab 2 charts.
+
+    Returns the ``(step, seconds)`` samples, the wall-clock time at which the
+    steady-state reruns started and ended, and the session's peak RSS in MB.
+    """
+    sampler = RssSampler()
+    sampler.start()
+    samples = []
+    at = AppTest.from_file(APP_PATH, default_timeout=timeout)
+    _timed_run(at, "open", samples, timeout)
+
+    at.text_input(key="user").input(role)
+    at.text_input(key="pass").input(CREDENTIALS[role])
+    _find(at.button, "INITIALIZE SESSION").click()
+    _timed_run(at, "login", samples, timeout)
+    # The login form is gone after st.rerun(); AppTest still carries its widget
+    # ids, so give them a value or the next run fails looking them up.
+    at.session_state["user"] = ""
+    at.session_state["pass"] = ""
+    steady_started = time.time()
+
+    age_label = "MY AGE" if role == "student" else "STUDENT AGE"
+    sem1_label = "SEM 1 GPA" if role == "student" else "SEM 1 GRADE"
+    rng = np.random.default_rng()
+    for _ in range(iterations):
+        _find(at.slider, age_label).set_value(int(rng.integers(17, 60)))
+        _timed_run(at, "slider", samples, timeout)
+        _find(at.slider, sem1_label).set_value(round(float(rng.uniform(0, 20)), 1))
+        _timed_run(at, "slider", samples, timeout)
+
+        _find(at.button, "INITIATE ANALYSIS PROCESS").click()
+        _timed_run(at, "analysis", samples, timeout)
+
+        chart_select = _find(at.selectbox, "SELECT VISUALIZATION")
+        for option in chart_select.options:
+            _find(at.selectbox, "SELECT VISUALIZATION").set_value(option)
+            _timed_run(at, "chart", samples, timeout)
+    sampler.stop()
+    return samples, steady_started, time.time(), sampler.peak_mb
+
+
+def run_level(n_sessions, roles, iterations, timeout):
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=n_sessions, mp_context=ctx) as pool:
+        futures = [pool.submit(run_session, roles[i % len(roles)], iterations, timeout) for i in range(n_sessions)]
+        sessions = [f.result() for f in futures]
+
+    samples = pd.DataFrame([s for session in sessions for s in session[0]], columns=["step", "seconds"])
+    cold = samples[samples["step"].isin(COLD_STEPS)]
+    steady = samples[~samples["step"].isin(COLD_STEPS)]
+    # Steady-state window only: worker spawn and cold start are excluded
+    wall = max(s[2] for s in sessions) - min(s[1] for s in sessions)
+    peaks = [s[3] for s in sessions]
+
+    p50, p95, p99 = np.percentile(steady["seconds"] * 1000, [50, 95, 99])
+    per_step = steady.groupby("step")["seconds"].median() * 1000
+    cold_ms = cold.groupby("step")["seconds"].agg(["median", "max"]) * 1000
+    return {
+        "sessions": n_sessions,
+        "reruns": len(steady),
+        "p50_ms": round(p50, 1),
+        "p95_ms": round(p95, 1),
+        "p99_ms": round(p99, 1),
+        "reruns_per_s": round(len(steady) / wall, 2),
+        "peak_rss_mb_session": round(max(peaks), 1),
+        "peak_rss_mb_total": round(sum(peaks), 1),
+        **{f"{step}_p50_ms": round(ms, 1) for step, ms in per_step.items()},
+        **{f"cold_{step}_{stat}_ms": round(cold_ms.loc[step, stat], 1)
+           for step in COLD_STEPS if step in cold_ms.index for stat in ("median", "max")},
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="concurrency levels to test")
+    parser.add_argument("--iterations", type=int, default=2, help="scripted loops per session")
+    parser.add_argument("--roles", nargs="+", default=["teacher", "counselor"], choices=list(CREDENTIALS))
+    parser.add_argument("--timeout", type=float, default=120, help="per-rerun timeout in seconds")
+    parser.add_argument("--csv", help="optional path to write the results table")
+    args = parser.parse_args(argv)
+
+    results = []
+    with tempfile.TemporaryDirectory(prefix="edupredict-loadtest-") as scratch:
+        data_dir = os.path.join(scratch, "data")
+        shutil.copytree(DATA_DIR, data_dir, ignore=shutil.ignore_patterns("*.db", "*.db-*", "*.jsonl"))
+        # Inherited by the spawned session workers
+        os.environ["EDUPREDICT_DATA_DIR"] = data_dir
+        os.environ["EDUPREDICT_TRAFFIC_TAG"] = "synthetic"
+        for n in args.sessions:
+            print(f"Running {n} concurrent session(s)...", flush=True)
+            results.append(run_level(n, args.roles, args.iterations, args.timeout))
+
+    table = pd.DataFrame(results)
+    print(table.to_string(index=False))
+    if args.csv:
+        table.to_csv(args.csv, index=False)
+
+
+if __name__ == "__main__":
+    main()